@@ -4,16 +4,25 @@ Credit Risk Assessment API — Flask Application Entry Point.
 Registers all route blueprints and starts the development server.
 """
 
-import sys
-import os
-
-# Add project root to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-
+from decimal import Decimal
 from flask import Flask, jsonify
+from flask_compress import Compress
 from flask_cors import CORS
+from flask_orjson import OrjsonProvider
+from sqlalchemy import text
 import config
-from backend.database import engine
+from backend.database import engine, Session
+from backend.cache import cache
+
+# Compiled once; reused by every readiness probe
+_PING = text("SELECT 1")
+
+
+def _json_default(obj):
+    """Fallback for types orjson does not serialize natively (Numeric columns)."""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
 
 
 def create_app():
@@ -21,6 +30,19 @@ def create_app():
     app = Flask(__name__)
     CORS(app)  # Enable Cross-Origin Resource Sharing
 
+    # orjson-backed serializer for jsonify (dates/datetimes handled natively)
+    app.json = OrjsonProvider(app)
+    app.json.default = _json_default
+
+    # In-process response cache (short TTLs, see config.py)
+    cache.init_app(app)
+
+    # gzip/brotli compression for JSON responses
+    app.config.from_mapping({
+        key: getattr(config, key) for key in dir(config) if key.startswith('COMPRESS_')
+    })
+    Compress(app)
+
     # ─── Register Blueprints ────────────────────────────────────
     from backend.routes.customer_routes import customer_bp
     from backend.routes.loan_routes import loan_bp
@@ -30,17 +52,18 @@ def create_app():
     app.register_blueprint(loan_bp)
     app.register_blueprint(portfolio_bp)
 
-    # ─── Health Check Endpoint ──────────────────────────────────
+    # ─── Request-scoped DB session ──────────────────────────────
+    @app.teardown_appcontext
+    def remove_session(exception=None):
+        """Close the request's session and return its connection to the pool."""
+        Session.remove()
+
+    # ─── Health Check Endpoints ─────────────────────────────────
     @app.route('/health', methods=['GET'])
     def health_check():
-        """System health status with database connectivity check."""
-        try:
-            from sqlalchemy import text
-            with engine.connect() as conn:
-                conn.execute(text("SELECT 1"))
-            db_status = 'connected'
-        except Exception:
-            db_status = 'disconnected'
+        """Liveness probe — reports pool state without querying the database."""
+        pool = engine.pool
+        db_status = 'connected' if pool.checkedin() + pool.checkedout() > 0 else 'idle'
 
         return jsonify({
             'status': 'healthy',
@@ -48,6 +71,23 @@ def create_app():
             'version': '1.0.0'
         }), 200
 
+    @app.route('/readiness', methods=['GET'])
+    def readiness_check():
+        """Readiness probe — round-trips a SELECT 1 to the database (result cached briefly)."""
+        ready = cache.get('readiness')
+        if ready is None:
+            try:
+                with engine.connect() as conn:
+                    conn.execute(_PING)
+                ready = True
+            except Exception:
+                ready = False
+            cache.set('readiness', ready, timeout=config.HEALTH_CACHE_TTL)
+
+        if not ready:
+            return jsonify({'status': 'unavailable', 'database': 'disconnected'}), 503
+        return jsonify({'status': 'ready', 'database': 'connected'}), 200
+
     # ─── Root Endpoint ──────────────────────────────────────────
     @app.route('/', methods=['GET'])
     def root():
@@ -57,6 +97,7 @@ def create_app():
             'version': '1.0.0',
             'endpoints': {
                 'health': '/health',
+                'readiness': '/readiness',
                 'customers': '/api/customers/',
                 'customer_detail': '/api/customers/<id>',
                 'loan_apply': '/api/loans/apply',
@@ -81,6 +122,8 @@ def create_app():
 
 
 if __name__ == '__main__':
+    # Werkzeug development server only — use `gunicorn 'backend.app:create_app()'`
+    # (see gunicorn.conf.py) for anything beyond local development
     app = create_app()
     print("=" * 60)
     print("🚀 CREDIT RISK ASSESSMENT API STARTING")
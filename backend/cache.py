@@ -0,0 +1,36 @@
+"""
+In-process HTTP response cache with ETag revalidation.
+
+Responses are stored as already-serialized JSON bodies for a few seconds,
+so repeated requests skip the database entirely and clients holding the
+current ETag get a bodiless 304 Not Modified.
+"""
+
+import hashlib
+from flask import Response, request
+from flask_caching import Cache
+
+cache = Cache(config={'CACHE_TYPE': 'SimpleCache'})
+
+
+def compute_etag(body):
+    """Short content hash of a serialized response body."""
+    return hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
+def is_ok_response(rv):
+    """response_filter for cache.cached(): only store successful responses."""
+    status = rv[1] if isinstance(rv, tuple) else rv.status_code
+    return status == 200
+
+
+def cached_json_response(body, etag, max_age):
+    """
+    Build a JSON response from a cached body.
+
+    Returns 304 Not Modified when the request's If-None-Match matches `etag`.
+    """
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.max_age = max_age
+    return response.make_conditional(request)
@@ -2,13 +2,8 @@
 SQLAlchemy database connection and session management.
 """
 
-import sys
-import os
-
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker, scoped_session, declarative_base
 import config
 
 # Create SQLAlchemy engine with connection pooling
@@ -17,13 +12,19 @@ engine = create_engine(
     pool_size=config.POOL_SIZE,
     max_overflow=config.MAX_OVERFLOW,
     pool_timeout=config.POOL_TIMEOUT,
-    pool_pre_ping=True,  # Verify connections before use
+    pool_recycle=config.POOL_RECYCLE,
+    pool_pre_ping=config.POOL_PRE_PING,
+    connect_args={'prepare_threshold': config.PREPARE_THRESHOLD},
     echo=False
 )
 
 # Session factory
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
+# Request-scoped session registry for the API — removed in the app's
+# teardown_appcontext handler, so route handlers never close it themselves
+Session = scoped_session(SessionLocal)
+
 # Base class for ORM models
 Base = declarative_base()
 
@@ -42,10 +43,25 @@ def get_db_session():
     return SessionLocal()
 
 
+def estimate_row_count(session, table_name):
+    """
+    Cheap row-count estimate from the PostgreSQL planner statistics.
+
+    Reads pg_class.reltuples instead of scanning the table with COUNT(*).
+    Returns None when the table has never been analyzed.
+    """
+    estimate = session.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE relname = :table_name"),
+        {'table_name': table_name}
+    ).scalar()
+    if estimate is None or estimate < 0:
+        return None
+    return int(estimate)
+
+
 def test_connection():
     """Test database connectivity."""
     try:
-        from sqlalchemy import text
         with engine.connect() as conn:
             conn.execute(text("SELECT 1"))
         return True
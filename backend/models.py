@@ -1,22 +1,78 @@
 """
 SQLAlchemy ORM models for all 9 database tables.
+
+Numeric columns are declared with asdecimal=False so the driver hands back
+floats directly and to_dict() can emit them without per-field conversion.
 """
 
 from sqlalchemy import (
     Column, Integer, String, Numeric, Date, DateTime, Text,
-    ForeignKey, CheckConstraint
+    ForeignKey, CheckConstraint, Index, Computed
 )
+from sqlalchemy import event
 from sqlalchemy.orm import relationship
+from sqlalchemy.orm.attributes import instance_state
 from sqlalchemy.sql import func
 from backend.database import Base
 
 
-class Customer(Base):
+def _date_str(value):
+    """ISO-format a Date column (same output as str(), without the dispatch)."""
+    return None if value is None else value.isoformat()
+
+
+def _datetime_str(value):
+    """Format a DateTime column exactly like str() does."""
+    return None if value is None else value.isoformat(' ')
+
+
+class SerializableMixin:
+    """
+    Memoizes to_dict() on clean, persistent instances.
+
+    Models using the mixin build their dict in _build_dict(); to_dict()
+    wraps it with the cache.
+
+    The cached dict is dropped whenever a mapped column is set or the
+    instance is expired/refreshed, and callers always receive a copy so
+    they can extend it freely. Pending or modified instances are never
+    cached, since flush may still fill in generated values.
+    """
+
+    def to_dict(self):
+        cached = self.__dict__.get('_dict_cache')
+        if cached is None:
+            cached = self._build_dict()
+            state = instance_state(self)
+            if state.persistent and not state.modified:
+                self.__dict__['_dict_cache'] = cached
+        return dict(cached)
+
+
+def _clear_dict_cache(target, *args):
+    target.__dict__.pop('_dict_cache', None)
+
+
+event.listen(SerializableMixin, 'expire', _clear_dict_cache, propagate=True)
+event.listen(SerializableMixin, 'refresh', _clear_dict_cache, propagate=True)
+
+
+@event.listens_for(SerializableMixin, 'mapper_configured', propagate=True)
+def _watch_column_sets(mapper, class_):
+    for attr in mapper.column_attrs:
+        event.listen(getattr(class_, attr.key), 'set', _clear_dict_cache)
+
+
+class Customer(SerializableMixin, Base):
     __tablename__ = 'customers'
+    __table_args__ = (
+        Index('idx_customers_full_name', 'full_name'),
+    )
 
     customer_id = Column(Integer, primary_key=True, autoincrement=True)
     first_name = Column(String(100), nullable=False)
     last_name = Column(String(100), nullable=False)
+    full_name = Column(String(201), Computed("first_name || ' ' || last_name", persisted=True))
     date_of_birth = Column(Date, nullable=False)
     gender = Column(String(10))
     email = Column(String(200), unique=True, nullable=False)
@@ -27,21 +83,21 @@ class Customer(Base):
     pincode = Column(String(10))
     pan_number = Column(String(10), unique=True)
     aadhar_number = Column(String(12), unique=True)
-    created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now())
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
     # Relationships
     employment = relationship('EmploymentDetail', back_populates='customer', uselist=False)
     applications = relationship('LoanApplication', back_populates='customer')
     loans = relationship('Loan', back_populates='customer')
 
-    def to_dict(self):
+    def _build_dict(self):
         return {
             'customer_id': self.customer_id,
-            'full_name': f"{self.first_name} {self.last_name}",
+            'full_name': self.full_name,
             'first_name': self.first_name,
             'last_name': self.last_name,
-            'date_of_birth': str(self.date_of_birth),
+            'date_of_birth': _date_str(self.date_of_birth),
             'gender': self.gender,
             'email': self.email,
             'phone': self.phone,
@@ -49,11 +105,11 @@ class Customer(Base):
             'city': self.city,
             'state': self.state,
             'pincode': self.pincode,
-            'created_at': str(self.created_at)
+            'created_at': _datetime_str(self.created_at)
         }
 
 
-class EmploymentDetail(Base):
+class EmploymentDetail(SerializableMixin, Base):
     __tablename__ = 'employment_details'
 
     employment_id = Column(Integer, primary_key=True, autoincrement=True)
@@ -61,85 +117,120 @@ class EmploymentDetail(Base):
     employer_name = Column(String(200))
     employment_type = Column(String(50))
     designation = Column(String(100))
-    monthly_income = Column(Numeric(15, 2), nullable=False)
-    years_of_experience = Column(Numeric(5, 2), default=0)
+    monthly_income = Column(Numeric(15, 2, asdecimal=False), nullable=False)
+    years_of_experience = Column(Numeric(5, 2, asdecimal=False), default=0)
     office_address = Column(Text)
-    created_at = Column(DateTime, default=func.now())
+    created_at = Column(DateTime, server_default=func.now())
 
     # Relationships
     customer = relationship('Customer', back_populates='employment')
 
-    def to_dict(self):
+    def _build_dict(self):
         return {
             'employment_id': self.employment_id,
             'employer_name': self.employer_name,
             'employment_type': self.employment_type,
             'designation': self.designation,
-            'monthly_income': float(self.monthly_income),
-            'years_of_experience': float(self.years_of_experience) if self.years_of_experience else 0,
+            'monthly_income': self.monthly_income,
+            'years_of_experience': self.years_of_experience or 0.0,
             'office_address': self.office_address
         }
 
 
-class LoanApplication(Base):
+class LoanApplication(SerializableMixin, Base):
     __tablename__ = 'loan_applications'
+    __table_args__ = (
+        Index('idx_applications_status_date', 'status', 'application_date'),
+    )
 
     application_id = Column(Integer, primary_key=True, autoincrement=True)
     customer_id = Column(Integer, ForeignKey('customers.customer_id', ondelete='CASCADE'), nullable=False)
-    loan_amount = Column(Numeric(15, 2), nullable=False)
+    loan_amount = Column(Numeric(15, 2, asdecimal=False), nullable=False)
     loan_tenure_months = Column(Integer, nullable=False)
-    interest_rate = Column(Numeric(5, 2), nullable=False)
+    interest_rate = Column(Numeric(5, 2, asdecimal=False), nullable=False)
     loan_purpose = Column(String(100))
-    application_date = Column(DateTime, default=func.now())
+    application_date = Column(DateTime, server_default=func.now())
     status = Column(String(20), default='Pending')
-    credit_score = Column(Numeric(6, 2))
-    risk_probability = Column(Numeric(6, 4))
-    risk_level = Column(String(20))
+    credit_score = Column(Numeric(6, 2, asdecimal=False))
+    risk_probability = Column(Numeric(6, 4, asdecimal=False))
+    # Derived in the database so bulk re-scoring is a single UPDATE of
+    # risk_probability; thresholds match calculations.get_risk_level()
+    risk_level = Column(String(20), Computed(
+        "CASE WHEN risk_probability < 0.30 THEN 'Low' "
+        "WHEN risk_probability < 0.60 THEN 'Medium' "
+        "WHEN risk_probability IS NOT NULL THEN 'High' END",
+        persisted=True
+    ))
     recommendation = Column(Text)
     ml_model_version = Column(String(50))
     processing_time_ms = Column(Integer)
-    created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now())
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
     # Relationships
     customer = relationship('Customer', back_populates='applications')
     loan = relationship('Loan', back_populates='application', uselist=False)
 
-    def to_dict(self):
+    def _build_dict(self):
         return {
             'application_id': self.application_id,
             'customer_id': self.customer_id,
-            'loan_amount': float(self.loan_amount),
+            'loan_amount': self.loan_amount,
             'loan_tenure_months': self.loan_tenure_months,
-            'interest_rate': float(self.interest_rate),
+            'interest_rate': self.interest_rate,
             'loan_purpose': self.loan_purpose,
-            'application_date': str(self.application_date),
+            'application_date': _datetime_str(self.application_date),
             'status': self.status,
-            'credit_score': float(self.credit_score) if self.credit_score else None,
-            'risk_probability': float(self.risk_probability) if self.risk_probability else None,
+            'credit_score': self.credit_score,
+            'risk_probability': self.risk_probability,
             'risk_level': self.risk_level,
             'recommendation': self.recommendation
         }
 
+    def to_summary_dict(self):
+        """Listing view — only the columns in summary_columns()."""
+        return {
+            'application_id': self.application_id,
+            'customer_id': self.customer_id,
+            'loan_amount': self.loan_amount,
+            'application_date': _datetime_str(self.application_date),
+            'status': self.status,
+            'credit_score': self.credit_score,
+            'risk_level': self.risk_level
+        }
+
+    @classmethod
+    def summary_columns(cls):
+        return (cls.application_id, cls.customer_id, cls.loan_amount,
+                cls.application_date, cls.status, cls.credit_score, cls.risk_level)
+
+
+# Customer history listing: WHERE customer_id = ? ORDER BY application_date DESC
+Index('idx_applications_customer_date',
+      LoanApplication.customer_id, LoanApplication.application_date.desc())
 
-class Loan(Base):
+
+class Loan(SerializableMixin, Base):
     __tablename__ = 'loans'
+    __table_args__ = (
+        Index('idx_loans_status', 'loan_status'),
+    )
 
     loan_id = Column(Integer, primary_key=True, autoincrement=True)
     application_id = Column(Integer, ForeignKey('loan_applications.application_id', ondelete='CASCADE'), nullable=True)
     customer_id = Column(Integer, ForeignKey('customers.customer_id', ondelete='CASCADE'), nullable=False)
-    loan_amount = Column(Numeric(15, 2), nullable=False)
-    disbursed_amount = Column(Numeric(15, 2))
-    interest_rate = Column(Numeric(5, 2), nullable=False)
+    loan_amount = Column(Numeric(15, 2, asdecimal=False), nullable=False)
+    disbursed_amount = Column(Numeric(15, 2, asdecimal=False))
+    interest_rate = Column(Numeric(5, 2, asdecimal=False), nullable=False)
     tenure_months = Column(Integer, nullable=False)
-    emi_amount = Column(Numeric(15, 2))
+    emi_amount = Column(Numeric(15, 2, asdecimal=False))
     loan_start_date = Column(Date)
     loan_end_date = Column(Date)
     loan_status = Column(String(20), default='Active')
-    outstanding_amount = Column(Numeric(15, 2))
-    total_paid = Column(Numeric(15, 2), default=0)
-    created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now())
+    outstanding_amount = Column(Numeric(15, 2, asdecimal=False))
+    total_paid = Column(Numeric(15, 2, asdecimal=False), default=0)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
     # Relationships
     application = relationship('LoanApplication', back_populates='loan')
@@ -150,104 +241,129 @@ class Loan(Base):
     guarantors = relationship('Guarantor', back_populates='loan')
     npa_records = relationship('NPATracking', back_populates='loan')
 
-    def to_dict(self):
+    def _build_dict(self):
         return {
             'loan_id': self.loan_id,
             'application_id': self.application_id,
             'customer_id': self.customer_id,
-            'loan_amount': float(self.loan_amount),
-            'disbursed_amount': float(self.disbursed_amount) if self.disbursed_amount else None,
-            'interest_rate': float(self.interest_rate),
+            'loan_amount': self.loan_amount,
+            'disbursed_amount': self.disbursed_amount,
+            'interest_rate': self.interest_rate,
             'tenure_months': self.tenure_months,
-            'emi_amount': float(self.emi_amount) if self.emi_amount else None,
-            'loan_start_date': str(self.loan_start_date) if self.loan_start_date else None,
-            'loan_end_date': str(self.loan_end_date) if self.loan_end_date else None,
+            'emi_amount': self.emi_amount,
+            'loan_start_date': _date_str(self.loan_start_date),
+            'loan_end_date': _date_str(self.loan_end_date),
+            'loan_status': self.loan_status,
+            'outstanding_amount': self.outstanding_amount,
+            'total_paid': self.total_paid or 0.0
+        }
+
+    def to_summary_dict(self):
+        """Listing view — only the columns in summary_columns()."""
+        return {
+            'loan_id': self.loan_id,
+            'customer_id': self.customer_id,
+            'loan_amount': self.loan_amount,
+            'emi_amount': self.emi_amount,
+            'loan_start_date': _date_str(self.loan_start_date),
             'loan_status': self.loan_status,
-            'outstanding_amount': float(self.outstanding_amount) if self.outstanding_amount else None,
-            'total_paid': float(self.total_paid) if self.total_paid else 0
+            'outstanding_amount': self.outstanding_amount
         }
 
+    @classmethod
+    def summary_columns(cls):
+        return (cls.loan_id, cls.customer_id, cls.loan_amount, cls.emi_amount,
+                cls.loan_start_date, cls.loan_status, cls.outstanding_amount)
+
+
+# Outstanding-exposure sums only ever cover open (Active/Defaulted) loans
+Index('idx_loans_outstanding_open', Loan.loan_status, Loan.outstanding_amount,
+      postgresql_where=Loan.loan_status.in_(['Active', 'Defaulted']))
+
 
-class Disbursement(Base):
+class Disbursement(SerializableMixin, Base):
     __tablename__ = 'disbursements'
 
     disbursement_id = Column(Integer, primary_key=True, autoincrement=True)
     loan_id = Column(Integer, ForeignKey('loans.loan_id', ondelete='CASCADE'), nullable=False)
     disbursement_date = Column(Date, nullable=False)
-    amount = Column(Numeric(15, 2), nullable=False)
+    amount = Column(Numeric(15, 2, asdecimal=False), nullable=False)
     payment_mode = Column(String(50))
     reference_number = Column(String(100))
-    created_at = Column(DateTime, default=func.now())
+    created_at = Column(DateTime, server_default=func.now())
 
     loan = relationship('Loan', back_populates='disbursements')
 
-    def to_dict(self):
+    def _build_dict(self):
         return {
             'disbursement_id': self.disbursement_id,
             'loan_id': self.loan_id,
-            'disbursement_date': str(self.disbursement_date),
-            'amount': float(self.amount),
+            'disbursement_date': _date_str(self.disbursement_date),
+            'amount': self.amount,
             'payment_mode': self.payment_mode,
             'reference_number': self.reference_number
         }
 
 
-class Repayment(Base):
+class Repayment(SerializableMixin, Base):
     __tablename__ = 'repayments'
+    __table_args__ = (
+        Index('idx_repayments_status_due', 'payment_status', 'due_date'),
+    )
 
     repayment_id = Column(Integer, primary_key=True, autoincrement=True)
     loan_id = Column(Integer, ForeignKey('loans.loan_id', ondelete='CASCADE'), nullable=False)
     due_date = Column(Date, nullable=False)
     payment_date = Column(Date)
-    emi_amount = Column(Numeric(15, 2), nullable=False)
-    principal_component = Column(Numeric(15, 2))
-    interest_component = Column(Numeric(15, 2))
-    amount_paid = Column(Numeric(15, 2), default=0)
+    emi_amount = Column(Numeric(15, 2, asdecimal=False), nullable=False)
+    principal_component = Column(Numeric(15, 2, asdecimal=False))
+    interest_component = Column(Numeric(15, 2, asdecimal=False))
+    amount_paid = Column(Numeric(15, 2, asdecimal=False), default=0)
     payment_status = Column(String(20), default='Pending')
     days_overdue = Column(Integer, default=0)
-    penalty_amount = Column(Numeric(15, 2), default=0)
-    created_at = Column(DateTime, default=func.now())
+    penalty_amount = Column(Numeric(15, 2, asdecimal=False), default=0)
+    created_at = Column(DateTime, server_default=func.now())
 
     loan = relationship('Loan', back_populates='repayments')
 
-    def to_dict(self):
+    def _build_dict(self):
         return {
             'repayment_id': self.repayment_id,
             'loan_id': self.loan_id,
-            'due_date': str(self.due_date),
-            'payment_date': str(self.payment_date) if self.payment_date else None,
-            'emi_amount': float(self.emi_amount),
-            'amount_paid': float(self.amount_paid) if self.amount_paid else 0,
+            'due_date': _date_str(self.due_date),
+            'payment_date': _date_str(self.payment_date),
+            'emi_amount': self.emi_amount,
+            'amount_paid': self.amount_paid or 0.0,
             'payment_status': self.payment_status,
             'days_overdue': self.days_overdue
         }
 
 
-class Collateral(Base):
+class Collateral(SerializableMixin, Base):
     __tablename__ = 'collateral'
 
     collateral_id = Column(Integer, primary_key=True, autoincrement=True)
     loan_id = Column(Integer, ForeignKey('loans.loan_id', ondelete='CASCADE'), nullable=False)
     collateral_type = Column(String(100))
     description = Column(Text)
-    estimated_value = Column(Numeric(15, 2))
+    estimated_value = Column(Numeric(15, 2, asdecimal=False))
     valuation_date = Column(Date)
-    created_at = Column(DateTime, default=func.now())
+    created_at = Column(DateTime, server_default=func.now())
 
     loan = relationship('Loan', back_populates='collateral_items')
 
-    def to_dict(self):
+    def _build_dict(self):
         return {
             'collateral_id': self.collateral_id,
             'loan_id': self.loan_id,
             'collateral_type': self.collateral_type,
             'description': self.description,
-            'estimated_value': float(self.estimated_value) if self.estimated_value else None,
-            'valuation_date': str(self.valuation_date) if self.valuation_date else None
+            'estimated_value': self.estimated_value,
+            'valuation_date': _date_str(self.valuation_date)
         }
 
 
-class Guarantor(Base):
+class Guarantor(SerializableMixin, Base):
     __tablename__ = 'guarantors'
 
     guarantor_id = Column(Integer, primary_key=True, autoincrement=True)
@@ -256,13 +372,13 @@ class Guarantor(Base):
     guarantor_relationship = Column('relationship', String(100))
     phone = Column(String(20))
     email = Column(String(200))
-    monthly_income = Column(Numeric(15, 2))
+    monthly_income = Column(Numeric(15, 2, asdecimal=False))
     address = Column(Text)
-    created_at = Column(DateTime, default=func.now())
+    created_at = Column(DateTime, server_default=func.now())
 
     loan = relationship('Loan', back_populates='guarantors')
 
-    def to_dict(self):
+    def _build_dict(self):
         return {
             'guarantor_id': self.guarantor_id,
             'loan_id': self.loan_id,
@@ -270,36 +386,36 @@ class Guarantor(Base):
             'relationship': self.guarantor_relationship,
             'phone': self.phone,
             'email': self.email,
-            'monthly_income': float(self.monthly_income) if self.monthly_income else None
+            'monthly_income': self.monthly_income
         }
 
 
-class NPATracking(Base):
+class NPATracking(SerializableMixin, Base):
     __tablename__ = 'npa_tracking'
 
     npa_id = Column(Integer, primary_key=True, autoincrement=True)
     loan_id = Column(Integer, ForeignKey('loans.loan_id', ondelete='CASCADE'), nullable=False)
     npa_date = Column(Date, nullable=False)
     days_overdue = Column(Integer, nullable=False)
-    outstanding_amount = Column(Numeric(15, 2))
+    outstanding_amount = Column(Numeric(15, 2, asdecimal=False))
     npa_category = Column(String(20))
-    provision_amount = Column(Numeric(15, 2))
+    provision_amount = Column(Numeric(15, 2, asdecimal=False))
     resolution_status = Column(String(50), default='Open')
     notes = Column(Text)
-    created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now())
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
     loan = relationship('Loan', back_populates='npa_records')
 
-    def to_dict(self):
+    def _build_dict(self):
         return {
             'npa_id': self.npa_id,
             'loan_id': self.loan_id,
-            'npa_date': str(self.npa_date),
+            'npa_date': _date_str(self.npa_date),
             'days_overdue': self.days_overdue,
-            'outstanding_amount': float(self.outstanding_amount) if self.outstanding_amount else None,
+            'outstanding_amount': self.outstanding_amount,
             'npa_category': self.npa_category,
-            'provision_amount': float(self.provision_amount) if self.provision_amount else None,
+            'provision_amount': self.provision_amount,
             'resolution_status': self.resolution_status,
             'notes': self.notes
         }
@@ -2,134 +2,211 @@
 Customer API Routes — CRUD operations for customer management.
 """
 
+import msgspec
+import orjson
 from flask import Blueprint, request, jsonify
-from sqlalchemy import func
-from backend.database import get_db_session
-from backend.models import Customer, EmploymentDetail
+from sqlalchemy import func, select, cast, literal
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import joinedload, aliased
+import config
+from backend.cache import cache, compute_etag, cached_json_response
+from backend.database import Session, estimate_row_count
+from backend.models import Customer, EmploymentDetail, _datetime_str
+from backend.schemas import CustomerCreate
 
 customer_bp = Blueprint('customers', __name__, url_prefix='/api/customers')
 
+# Columns emitted by Customer.to_dict(), selected as plain rows so list
+# responses skip ORM hydration entirely
+_customers = Customer.__table__.c
+_employment = EmploymentDetail.__table__.c
+_CUSTOMER_LIST_COLUMNS = (
+    _customers.customer_id,
+    _customers.full_name,
+    _customers.first_name,
+    _customers.last_name,
+    _customers.date_of_birth,
+    _customers.gender,
+    _customers.email,
+    _customers.phone,
+    _customers.address,
+    _customers.city,
+    _customers.state,
+    _customers.pincode,
+    _customers.created_at,
+)
+
+# Bumped when a customer is registered; part of every list cache key, so
+# pages cached before the insert are never served again
+_list_generation = 0
+
+
+def invalidate_customer_list_cache():
+    """Stop serving cached customer list pages after a new registration."""
+    global _list_generation
+    _list_generation += 1
+
 
 @customer_bp.route('/', methods=['GET'])
 def get_all_customers():
-    """Retrieve all customers with pagination."""
-    session = get_db_session()
+    """
+    Retrieve customers with keyset pagination.
+
+    Pass `after_id` (the previous page's `next_cursor`) to seek on the
+    primary key; plain `offset` is still accepted for the first pages.
+    `total` is a planner estimate unless `include_total=1` is given.
+
+    Rows are read as plain Core mappings (no ORM objects) and the page is
+    serialized once with orjson. That body is cached briefly and re-served
+    with an ETag.
+    """
+    limit = request.args.get('limit', 100, type=int)
+    offset = request.args.get('offset', 0, type=int)
+    after_id = request.args.get('after_id', type=int)
+    include_total = request.args.get('include_total', 0, type=int)
+
+    # Clamp values
+    limit = min(limit, 500)
+    offset = max(offset, 0)
+
+    cache_key = f'customers:{_list_generation}:{limit}:{offset}:{after_id}:{include_total}'
+    cached = cache.get(cache_key)
+    if cached is not None:
+        body, etag = cached
+        return cached_json_response(body, etag, config.RESPONSE_CACHE_TTL)
+
+    session = Session()
     try:
-        limit = request.args.get('limit', 100, type=int)
-        offset = request.args.get('offset', 0, type=int)
-
-        # Clamp values
-        limit = min(limit, 500)
-        offset = max(offset, 0)
-
-        customers = session.query(Customer)\
-            .order_by(Customer.customer_id)\
-            .offset(offset)\
-            .limit(limit)\
-            .all()
 
-        total = session.query(func.count(Customer.customer_id)).scalar()
-
-        return jsonify({
-            'customers': [c.to_dict() for c in customers],
+        total = None
+        if not include_total:
+            total = estimate_row_count(session, Customer.__tablename__)
+        if total is None:
+            total = session.query(func.count(Customer.customer_id)).scalar()
+
+        stmt = select(*_CUSTOMER_LIST_COLUMNS).order_by(_customers.customer_id)
+        if after_id is not None:
+            # Index seek on the primary key instead of an OFFSET scan
+            stmt = stmt.where(_customers.customer_id > after_id)
+        else:
+            stmt = stmt.offset(offset)
+
+        customers = []
+        for row in session.execute(stmt.limit(limit)).mappings():
+            row = dict(row)
+            # Same string as Customer.to_dict(), so list and detail agree
+            row['created_at'] = _datetime_str(row['created_at'])
+            customers.append(row)
+
+        body = orjson.dumps({
+            'customers': customers,
             'total': total,
             'limit': limit,
-            'offset': offset
-        }), 200
+            'offset': offset,
+            'after_id': after_id,
+            'next_cursor': customers[-1]['customer_id'] if customers and len(customers) == limit else None
+        })
+        etag = compute_etag(body)
+        cache.set(cache_key, (body, etag), timeout=config.RESPONSE_CACHE_TTL)
+        return cached_json_response(body, etag, config.RESPONSE_CACHE_TTL)
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        session.close()
 
 
 @customer_bp.route('/<int:customer_id>', methods=['GET'])
 def get_customer(customer_id):
     """Get detailed customer information including employment data."""
-    session = get_db_session()
+    session = Session()
     try:
-        customer = session.query(Customer).filter_by(customer_id=customer_id).first()
+        # Employment details are joined in the same round trip
+        customer = session.query(Customer)\
+            .options(joinedload(Customer.employment))\
+            .filter_by(customer_id=customer_id).first()
         if not customer:
             return jsonify({'error': f'Customer {customer_id} not found'}), 404
 
         result = customer.to_dict()
 
-        # Include employment details
-        employment = session.query(EmploymentDetail)\
-            .filter_by(customer_id=customer_id).first()
-        if employment:
-            result['employment'] = employment.to_dict()
+        if customer.employment:
+            result['employment'] = customer.employment.to_dict()
 
         return jsonify(result), 200
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        session.close()
 
 
 @customer_bp.route('/', methods=['POST'])
 def register_customer():
     """Register a new customer with KYC data."""
-    session = get_db_session()
+    session = Session()
     try:
-        data = request.get_json()
-        if not data:
+        body = request.get_data()
+        if not body:
             return jsonify({'error': 'Request body is required'}), 400
 
-        # Validate required fields
-        required = ['first_name', 'last_name', 'date_of_birth', 'email', 'phone']
-        missing = [f for f in required if f not in data]
-        if missing:
-            return jsonify({'error': f'Missing required fields: {", ".join(missing)}'}), 400
-
-        # Check for duplicate email
-        existing = session.query(Customer).filter_by(email=data['email']).first()
-        if existing:
-            return jsonify({'error': f'Email {data["email"]} already registered'}), 409
-
-        # Create customer
-        customer = Customer(
-            first_name=data['first_name'],
-            last_name=data['last_name'],
-            date_of_birth=data['date_of_birth'],
-            gender=data.get('gender'),
-            email=data['email'],
-            phone=data['phone'],
-            address=data.get('address'),
-            city=data.get('city'),
-            state=data.get('state'),
-            pincode=data.get('pincode'),
-            pan_number=data.get('pan_number'),
-            aadhar_number=data.get('aadhar_number')
-        )
-        session.add(customer)
-        session.flush()  # Get the generated customer_id
-
-        # Create employment details if provided
-        if 'employment' in data:
-            emp_data = data['employment']
-            employment = EmploymentDetail(
-                customer_id=customer.customer_id,
-                employer_name=emp_data.get('employer_name'),
-                employment_type=emp_data.get('employment_type'),
-                designation=emp_data.get('designation'),
-                monthly_income=emp_data.get('monthly_income', 0),
-                years_of_experience=emp_data.get('years_of_experience', 0),
-                office_address=emp_data.get('office_address')
-            )
-            session.add(employment)
-
+        # Parse and validate required fields/types in one pass
+        try:
+            data = msgspec.json.decode(body, type=CustomerCreate)
+        except msgspec.ValidationError as e:
+            return jsonify({'error': str(e)}), 400
+        except msgspec.DecodeError:
+            return jsonify({'error': 'Request body must be valid JSON'}), 400
+
+        # Create customer — a single INSERT that skips rows violating any
+        # unique constraint (email, PAN, Aadhar) instead of probing first
+        customer_insert = insert(Customer).values(
+            first_name=data.first_name,
+            last_name=data.last_name,
+            date_of_birth=data.date_of_birth,
+            gender=data.gender,
+            email=data.email,
+            phone=data.phone,
+            address=data.address,
+            city=data.city,
+            state=data.state,
+            pincode=data.pincode,
+            pan_number=data.pan_number,
+            aadhar_number=data.aadhar_number
+        ).on_conflict_do_nothing()
+
+        if data.employment is not None:
+            # Chain the employment insert onto the customer insert with
+            # data-modifying CTEs, so both rows land in one round trip (and
+            # no employment row is written when the customer conflicts)
+            emp_values = msgspec.structs.asdict(data.employment)
+            new_customer = customer_insert.returning(*_customers).cte('new_customer')
+            employment_insert = insert(EmploymentDetail).from_select(
+                ['customer_id', *emp_values],
+                select(
+                    new_customer.c.customer_id,
+                    *[cast(literal(value), _employment[column].type)
+                      for column, value in emp_values.items()]
+                )
+            ).cte('new_employment')
+            stmt = select(aliased(Customer, new_customer)).add_cte(employment_insert)
+        else:
+            stmt = customer_insert.returning(Customer)
+
+        customer = session.scalars(stmt).first()
+        if customer is None:
+            session.rollback()
+            return jsonify({
+                'error': f'Email {data.email}, PAN or Aadhar number already registered'
+            }), 409
+
+        # Serialize before commit so the expired instance isn't reloaded
+        result = customer.to_dict()
         session.commit()
+        invalidate_customer_list_cache()
 
         return jsonify({
             'message': 'Customer registered successfully',
-            'customer_id': customer.customer_id,
-            'customer': customer.to_dict()
+            'customer_id': result['customer_id'],
+            'customer': result
         }), 201
 
     except Exception as e:
         session.rollback()
         return jsonify({'error': str(e)}), 500
-    finally:
-        session.close()
@@ -2,63 +2,127 @@
 Loan API Routes — Loan application, ML predictions, and loan management.
 """
 
+import bisect
 import time
-import sys
-import os
+from datetime import date
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
-
-from flask import Blueprint, request, jsonify
+import orjson
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from sqlalchemy import func
-from backend.database import get_db_session
+from sqlalchemy.orm import load_only
+from backend.database import Session, estimate_row_count
 from backend.models import (
     Customer, EmploymentDetail, LoanApplication, Loan, Disbursement
 )
+from backend.routes.portfolio_routes import invalidate_portfolio_cache
+from backend.schemas import LoanFeatures
 from backend.utils.calculations import (
-    calculate_emi, calculate_dti_ratio, calculate_lti_ratio,
-    get_risk_level, generate_recommendation
+    calculate_emi, calculate_age, calculate_dti_ratio, calculate_lti_ratio,
+    get_risk_level, get_approval_status, generate_recommendation,
+    risk_probability_to_credit_score
 )
 
+# Imported once at startup; the model itself is loaded lazily and cached
+# inside ml.predict. Missing ML dependencies fall back to the rule-based path.
+try:
+    from ml.predict import predict_risk
+except ImportError:
+    predict_risk = None
+
 loan_bp = Blueprint('loans', __name__, url_prefix='/api/loans')
 
+# Rows fetched per server-side cursor round trip when streaming lists
+_STREAM_BATCH_SIZE = 100
+
+# Rule-based fallback: risk probability by DTI bucket (upper bounds
+# inclusive, so a DTI of exactly 0.20 is still in the lowest bucket)
+_FALLBACK_DTI_EDGES = (0.20, 0.30, 0.40, 0.50)
+_FALLBACK_RISK_PROBS = (0.08, 0.15, 0.35, 0.60, 0.85)
+_FALLBACK_CREDIT_SCORES = tuple(risk_probability_to_credit_score(p) for p in _FALLBACK_RISK_PROBS)
+
 
 def _get_ml_prediction(features):
     """
     Get ML prediction from the trained model.
     Falls back to rule-based assessment if model is unavailable.
     """
-    try:
-        from ml.predict import predict_risk
-        return predict_risk(features)
-    except Exception as e:
-        # Fallback: rule-based risk assessment
-        dti = features.get('debt_to_income_ratio', 0.5)
-        lti = features.get('loan_to_income_ratio', 5)
-
-        if dti > 0.50:
-            risk_prob = 0.85
-        elif dti > 0.40:
-            risk_prob = 0.60
-        elif dti > 0.30:
-            risk_prob = 0.35
-        elif dti > 0.20:
-            risk_prob = 0.15
+    if predict_risk is not None:
+        try:
+            return predict_risk(features)
+        except Exception:
+            pass
+
+    # Fallback: rule-based risk assessment
+    dti = features.debt_to_income_ratio
+    lti = features.loan_to_income_ratio
+
+    bucket = bisect.bisect_left(_FALLBACK_DTI_EDGES, dti)
+    risk_prob = _FALLBACK_RISK_PROBS[bucket]
+    credit_score = _FALLBACK_CREDIT_SCORES[bucket]
+
+    return {
+        'risk_probability': risk_prob,
+        'credit_score': credit_score,
+        'contributors': [
+            {'feature': 'debt_to_income_ratio', 'impact': round(dti * 0.8, 4)},
+            {'feature': 'loan_to_income_ratio', 'impact': round(min(lti * 0.04, 0.3), 4)},
+            {'feature': 'monthly_income', 'impact': round(-features.monthly_income / 500000, 4)}
+        ],
+        'model_used': 'rule_based_fallback'
+    }
+
+
+def _stream_page(key, rows, total, query, limit, offset, serialize):
+    """
+    Stream a page of rows as {key: [...], total, limit, offset}.
+
+    Rows arrive from a server-side cursor and are serialized one at a time.
+    The first row (and any fallback count) is fetched before the response
+    is returned, so a failing query still reaches the route's 500 handler.
+    An error while streaming the remaining rows closes the JSON with an
+    `error` key in place of `total`, so clients can tell the page is
+    incomplete.
+
+    When `total` is None it is read off the COUNT(*) OVER () column of the
+    first row; an empty page past the first carries no total, so only then
+    is a separate count issued.
+    """
+    first = rows.fetchone()
+    if total is None:
+        if first is not None:
+            total = first.total
         else:
-            risk_prob = 0.08
+            total = query.count() if offset else 0
 
-        from backend.utils.calculations import risk_probability_to_credit_score
-        credit_score = risk_probability_to_credit_score(risk_prob)
+    def generate():
+        yield b'{"' + key.encode() + b'":['
+        try:
+            if first is not None:
+                yield orjson.dumps(serialize(first[0]))
+                for row in rows:
+                    yield b',' + orjson.dumps(serialize(row[0]))
+        except Exception as e:
+            yield b'],' + orjson.dumps({'error': str(e)})[1:]
+            return
+        yield b'],' + orjson.dumps({'total': total, 'limit': limit, 'offset': offset})[1:]
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
 
-        return {
-            'risk_probability': risk_prob,
-            'credit_score': credit_score,
-            'contributors': [
-                {'feature': 'debt_to_income_ratio', 'impact': round(dti * 0.8, 4)},
-                {'feature': 'loan_to_income_ratio', 'impact': round(min(lti * 0.04, 0.3), 4)},
-                {'feature': 'monthly_income', 'impact': round(-features.get('monthly_income', 50000) / 500000, 4)}
-            ],
-            'model_used': 'rule_based_fallback'
-        }
+
+def _page_total(session, query, model, filtered):
+    """
+    Planner estimate for an unfiltered listing, or None to count exactly.
+
+    Unfiltered pages of a large table are totalled from pg_class statistics
+    unless `include_total=1` is given; filtered pages add COUNT(*) OVER ()
+    to `query` instead. Returns (query, total).
+    """
+    total = None
+    if not filtered and not request.args.get('include_total', 0, type=int):
+        total = estimate_row_count(session, model.__tablename__)
+    if total is None:
+        query = query.add_columns(func.count().over().label('total'))
+    return query, total
 
 
 @loan_bp.route('/apply', methods=['POST'])
@@ -67,7 +131,7 @@ def apply_for_loan():
     Submit a new loan application with real-time ML prediction.
     Returns credit score, risk probability, and SHAP-based feature contributions.
     """
-    session = get_db_session()
+    session = Session()
     start_time = time.time()
 
     try:
@@ -87,13 +151,14 @@ def apply_for_loan():
         interest_rate = float(data['interest_rate'])
         loan_purpose = data.get('loan_purpose', 'Personal')
 
-        # Fetch customer data
-        customer = session.query(Customer).filter_by(customer_id=customer_id).first()
-        if not customer:
+        # Fetch customer and employment data in one round trip
+        row = session.query(Customer, EmploymentDetail)\
+            .outerjoin(EmploymentDetail, EmploymentDetail.customer_id == Customer.customer_id)\
+            .filter(Customer.customer_id == customer_id).first()
+        if not row:
             return jsonify({'error': f'Customer {customer_id} not found'}), 404
 
-        employment = session.query(EmploymentDetail)\
-            .filter_by(customer_id=customer_id).first()
+        customer, employment = row
         if not employment:
             return jsonify({'error': f'Employment data not found for customer {customer_id}'}), 404
 
@@ -107,44 +172,40 @@ def apply_for_loan():
         lti_ratio = calculate_lti_ratio(loan_amount, annual_income)
 
         # Calculate age
-        from datetime import date
         today = date.today()
-        age = (today - customer.date_of_birth).days / 365.25
+        age = calculate_age(customer.date_of_birth, today)
 
         # Prepare features for ML model
-        features = {
-            'loan_amount': loan_amount,
-            'loan_tenure_months': tenure_months,
-            'interest_rate': interest_rate,
-            'monthly_income': monthly_income,
-            'annual_income': annual_income,
-            'years_of_experience': years_exp,
-            'age': age,
-            'estimated_emi': emi,
-            'debt_to_income_ratio': dti_ratio,
-            'loan_to_income_ratio': lti_ratio,
-            'emi_to_income_ratio': emi / monthly_income if monthly_income > 0 else 1,
-            'loan_purpose': loan_purpose,
-            'employment_type': employment.employment_type,
-            'city': customer.city
-        }
+        features = LoanFeatures(
+            loan_amount=loan_amount,
+            loan_tenure_months=tenure_months,
+            interest_rate=interest_rate,
+            monthly_income=monthly_income,
+            annual_income=annual_income,
+            years_of_experience=years_exp,
+            age=age,
+            estimated_emi=emi,
+            debt_to_income_ratio=dti_ratio,
+            loan_to_income_ratio=lti_ratio,
+            emi_to_income_ratio=emi / monthly_income if monthly_income > 0 else 1,
+            loan_purpose=loan_purpose,
+            employment_type=employment.employment_type,
+            city=customer.city
+        )
 
         # Get ML prediction
         prediction = _get_ml_prediction(features)
-        risk_probability = prediction['risk_probability']
+        # Rounded to the stored precision so the response agrees with the
+        # risk_level the database derives from it
+        risk_probability = round(prediction['risk_probability'], 4)
         credit_score = prediction['credit_score']
         contributors = prediction.get('contributors', [])
 
-        # Determine approval status
+        # Determine approval status (risk_level is recomputed by the database)
         risk_level = get_risk_level(risk_probability)
         recommendation = generate_recommendation(risk_probability, dti_ratio, lti_ratio, credit_score)
 
-        if risk_probability > 0.60:
-            status = 'Rejected'
-        elif risk_probability > 0.45:
-            status = 'Pending'
-        else:
-            status = 'Approved'
+        status = get_approval_status(risk_probability)
 
         processing_time = int((time.time() - start_time) * 1000)
 
@@ -157,24 +218,24 @@ def apply_for_loan():
             loan_purpose=loan_purpose,
             status=status,
             credit_score=credit_score,
-            risk_probability=round(risk_probability, 4),
-            risk_level=risk_level,
+            risk_probability=risk_probability,
             recommendation=recommendation,
             ml_model_version=prediction.get('model_used', 'RF_v1.0'),
             processing_time_ms=processing_time
         )
         session.add(application)
         session.commit()
+        invalidate_portfolio_cache()
 
         return jsonify({
             'application_id': application.application_id,
             'customer_id': customer_id,
             'credit_score': credit_score,
-            'risk_probability': round(risk_probability, 4),
+            'risk_probability': risk_probability,
             'risk_level': risk_level,
             'status': status,
             'recommendation': recommendation,
-            'model_confidence': round(risk_probability, 4),
+            'model_confidence': risk_probability,
             'contributors': contributors,
             'factors': {
                 'debt_to_income_ratio': round(dti_ratio * 100, 2),
@@ -188,17 +249,27 @@ def apply_for_loan():
     except Exception as e:
         session.rollback()
         return jsonify({'error': str(e)}), 500
-    finally:
-        session.close()
 
 
 @loan_bp.route('/applications', methods=['GET'])
 def get_applications():
-    """Retrieve loan applications with optional filtering."""
-    session = get_db_session()
+    """
+    Retrieve loan applications with optional filtering.
+
+    Rows are returned in full; `detail=summary` selects only the listing
+    columns (id, customer, amount, date, status, credit score, risk level).
+    `total` is a planner estimate for unfiltered listings unless
+    `include_total=1` is given; filtered listings are counted exactly.
+    """
+    session = Session()
     try:
         query = session.query(LoanApplication)
 
+        # ?detail=summary selects only the listing columns
+        summary = request.args.get('detail') == 'summary'
+        if summary:
+            query = query.options(load_only(*LoanApplication.summary_columns()))
+
         # Apply filters
         status = request.args.get('status')
         if status:
@@ -212,49 +283,47 @@ def get_applications():
         limit = min(request.args.get('limit', 100, type=int), 500)
         offset = max(request.args.get('offset', 0, type=int), 0)
 
-        applications = query.order_by(LoanApplication.application_date.desc())\
-            .offset(offset).limit(limit).all()
-
-        total = query.count()
+        query, total = _page_total(session, query, LoanApplication, bool(status or customer_id))
+        page = query.order_by(LoanApplication.application_date.desc())\
+            .offset(offset).limit(limit)
+        rows = session.execute(page.statement, execution_options={'yield_per': _STREAM_BATCH_SIZE})
+        serialize = LoanApplication.to_summary_dict if summary else LoanApplication.to_dict
 
-        return jsonify({
-            'applications': [a.to_dict() for a in applications],
-            'total': total,
-            'limit': limit,
-            'offset': offset
-        }), 200
+        return _stream_page('applications', rows, total, query, limit, offset, serialize), 200
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        session.close()
 
 
 @loan_bp.route('/loans', methods=['GET'])
 def get_loans():
-    """Retrieve all disbursed loans."""
-    session = get_db_session()
+    """
+    Retrieve all disbursed loans.
+
+    Rows are returned in full; `detail=summary` selects only the listing
+    columns (id, customer, amount, start date, EMI, status, outstanding).
+    `total` is a planner estimate unless filtered by status or
+    `include_total=1` is given.
+    """
+    session = Session()
     try:
         limit = min(request.args.get('limit', 100, type=int), 500)
         offset = max(request.args.get('offset', 0, type=int), 0)
 
         status = request.args.get('status')
         query = session.query(Loan)
+        summary = request.args.get('detail') == 'summary'
+        if summary:
+            query = query.options(load_only(*Loan.summary_columns()))
         if status:
             query = query.filter(Loan.loan_status == status)
 
-        loans = query.order_by(Loan.loan_id.desc())\
-            .offset(offset).limit(limit).all()
-        total = query.count()
+        query, total = _page_total(session, query, Loan, bool(status))
+        page = query.order_by(Loan.loan_id.desc()).offset(offset).limit(limit)
+        rows = session.execute(page.statement, execution_options={'yield_per': _STREAM_BATCH_SIZE})
+        serialize = Loan.to_summary_dict if summary else Loan.to_dict
 
-        return jsonify({
-            'loans': [l.to_dict() for l in loans],
-            'total': total,
-            'limit': limit,
-            'offset': offset
-        }), 200
+        return _stream_page('loans', rows, total, query, limit, offset, serialize), 200
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        session.close()
@@ -2,60 +2,80 @@
 Portfolio API Routes — Portfolio analytics, NPA analysis, and repayment statistics.
 """
 
+from datetime import datetime
+
 from flask import Blueprint, jsonify
 from sqlalchemy import func, case
-from backend.database import get_db_session
+import config
+from backend.cache import cache, is_ok_response
+from backend.database import Session
 from backend.models import (
     Loan, LoanApplication, Repayment, NPATracking, Disbursement
 )
 
 portfolio_bp = Blueprint('portfolio', __name__, url_prefix='/api/portfolio')
 
+# Cache keys for the aggregate endpoints (see invalidate_portfolio_cache)
+_SUMMARY_CACHE_KEY = 'portfolio/summary'
+_NPA_CACHE_KEY = 'portfolio/npa-analysis'
+_REPAYMENT_CACHE_KEY = 'portfolio/repayment-stats'
+
+
+def invalidate_portfolio_cache():
+    """Drop cached portfolio analytics after a write that changes them."""
+    cache.delete_many(_SUMMARY_CACHE_KEY, _NPA_CACHE_KEY, _REPAYMENT_CACHE_KEY)
+
 
 @portfolio_bp.route('/summary', methods=['GET'])
+@cache.cached(timeout=config.PORTFOLIO_CACHE_TTL, key_prefix=_SUMMARY_CACHE_KEY,
+              response_filter=is_ok_response)
 def get_portfolio_summary():
     """
     Get comprehensive portfolio health metrics.
     Includes loan statistics, financial metrics, and risk indicators.
+    `generated_at` is when the figures were computed, which can be up to
+    PORTFOLIO_CACHE_TTL seconds before the response is served.
     """
-    session = get_db_session()
+    session = Session()
     try:
-        # ─── Loan statistics ────────────────────────────────────
-        total_applications = session.query(func.count(LoanApplication.application_id)).scalar() or 0
-        total_loans = session.query(func.count(Loan.loan_id)).scalar() or 0
-
-        active_loans = session.query(func.count(Loan.loan_id))\
-            .filter(Loan.loan_status == 'Active').scalar() or 0
-        closed_loans = session.query(func.count(Loan.loan_id))\
-            .filter(Loan.loan_status == 'Closed').scalar() or 0
-        defaulted_loans = session.query(func.count(Loan.loan_id))\
-            .filter(Loan.loan_status == 'Defaulted').scalar() or 0
-
-        approved_apps = session.query(func.count(LoanApplication.application_id))\
-            .filter(LoanApplication.status == 'Approved').scalar() or 0
+        # ─── Loan statistics & financial metrics (one pass over loans) ──
+        (
+            total_loans, active_loans, closed_loans, defaulted_loans,
+            total_disbursed, total_outstanding, total_repaid, total_npa_amount
+        ) = session.query(
+            func.count(Loan.loan_id),
+            func.count(case((Loan.loan_status == 'Active', 1))),
+            func.count(case((Loan.loan_status == 'Closed', 1))),
+            func.count(case((Loan.loan_status == 'Defaulted', 1))),
+            func.coalesce(func.sum(Loan.disbursed_amount), 0),
+            func.coalesce(func.sum(case(
+                (Loan.loan_status.in_(['Active', 'Defaulted']), Loan.outstanding_amount)
+            )), 0),
+            func.coalesce(func.sum(Loan.total_paid), 0),
+            # NPA amount (outstanding on defaulted loans)
+            func.coalesce(func.sum(case(
+                (Loan.loan_status == 'Defaulted', Loan.outstanding_amount)
+            )), 0)
+        ).one()
+
+        total_applications, approved_apps = session.query(
+            func.count(LoanApplication.application_id),
+            func.count(case((LoanApplication.status == 'Approved', 1)))
+        ).one()
         approval_rate = round((approved_apps / total_applications * 100), 2) \
             if total_applications > 0 else 0
 
-        # ─── Financial metrics ──────────────────────────────────
-        total_disbursed = session.query(func.sum(Loan.disbursed_amount)).scalar() or 0
-        total_outstanding = session.query(func.sum(Loan.outstanding_amount))\
-            .filter(Loan.loan_status.in_(['Active', 'Defaulted'])).scalar() or 0
-        total_repaid = session.query(func.sum(Loan.total_paid)).scalar() or 0
-
-        # NPA amount (outstanding on defaulted loans)
-        total_npa_amount = session.query(func.sum(Loan.outstanding_amount))\
-            .filter(Loan.loan_status == 'Defaulted').scalar() or 0
-
         # ─── Risk metrics ───────────────────────────────────────
-        npa_ratio = round((float(total_npa_amount) / float(total_outstanding) * 100), 2) \
+        npa_ratio = round((total_npa_amount / total_outstanding * 100), 2) \
             if total_outstanding > 0 else 0
         default_rate = round((defaulted_loans / total_loans * 100), 2) \
             if total_loans > 0 else 0
 
         # Average EMI payment rate
-        total_due = session.query(func.count(Repayment.repayment_id)).scalar() or 0
-        paid_on_time = session.query(func.count(Repayment.repayment_id))\
-            .filter(Repayment.payment_status == 'Paid').scalar() or 0
+        total_due, paid_on_time = session.query(
+            func.count(Repayment.repayment_id),
+            func.count(case((Repayment.payment_status == 'Paid', 1)))
+        ).one()
         avg_payment_rate = round((paid_on_time / total_due * 100), 2) if total_due > 0 else 0
 
         return jsonify({
@@ -68,41 +88,51 @@ def get_portfolio_summary():
                 'approval_rate': approval_rate
             },
             'financial_metrics': {
-                'total_disbursed': float(total_disbursed),
-                'total_outstanding': float(total_outstanding),
-                'total_repaid': float(total_repaid),
-                'total_npa_amount': float(total_npa_amount)
+                'total_disbursed': total_disbursed,
+                'total_outstanding': total_outstanding,
+                'total_repaid': total_repaid,
+                'total_npa_amount': total_npa_amount
             },
             'risk_metrics': {
                 'npa_ratio': npa_ratio,
                 'default_rate': default_rate,
                 'average_emi_payment_rate': avg_payment_rate
-            }
+            },
+            'generated_at': datetime.now().isoformat(' ', 'seconds')
         }), 200
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        session.close()
 
 
 @portfolio_bp.route('/npa-analysis', methods=['GET'])
+@cache.cached(timeout=config.PORTFOLIO_CACHE_TTL, key_prefix=_NPA_CACHE_KEY,
+              response_filter=is_ok_response)
 def get_npa_analysis():
     """
     Get detailed NPA classification breakdown.
     Categories: Standard, Sub-Standard, Doubtful, Loss
     """
-    session = get_db_session()
+    session = Session()
     try:
         total_loans = session.query(func.count(Loan.loan_id)).scalar() or 1
 
-        # Count loans by NPA category
-        npa_counts = session.query(
+        # Count and amounts by NPA category in a single grouped scan
+        npa_rows = session.query(
             NPATracking.npa_category,
-            func.count(NPATracking.npa_id)
+            func.count(NPATracking.npa_id),
+            func.sum(NPATracking.outstanding_amount),
+            func.sum(NPATracking.provision_amount)
         ).group_by(NPATracking.npa_category).all()
 
-        npa_dict = {cat: count for cat, count in npa_counts}
+        npa_dict = {}
+        amount_breakdown = {}
+        for cat, count, outstanding, provision in npa_rows:
+            npa_dict[cat] = count
+            amount_breakdown[cat] = {
+                'outstanding_amount': outstanding or 0,
+                'provision_amount': provision or 0
+            }
 
         # Standard = total loans - all NPA loans
         total_npa = sum(npa_dict.values())
@@ -122,20 +152,6 @@ def get_npa_analysis():
                 'percentage': round(count / total_loans * 100, 2)
             }
 
-        # Total NPA amount by category
-        npa_amounts = session.query(
-            NPATracking.npa_category,
-            func.sum(NPATracking.outstanding_amount),
-            func.sum(NPATracking.provision_amount)
-        ).group_by(NPATracking.npa_category).all()
-
-        amount_breakdown = {}
-        for cat, outstanding, provision in npa_amounts:
-            amount_breakdown[cat] = {
-                'outstanding_amount': float(outstanding) if outstanding else 0,
-                'provision_amount': float(provision) if provision else 0
-            }
-
         return jsonify({
             'npa_classification': classification,
             'amount_breakdown': amount_breakdown,
@@ -145,14 +161,14 @@ def get_npa_analysis():
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        session.close()
 
 
 @portfolio_bp.route('/repayment-stats', methods=['GET'])
+@cache.cached(timeout=config.PORTFOLIO_CACHE_TTL, key_prefix=_REPAYMENT_CACHE_KEY,
+              response_filter=is_ok_response)
 def get_repayment_stats():
     """Get repayment performance metrics."""
-    session = get_db_session()
+    session = Session()
     try:
         # Payment status distribution
         status_counts = session.query(
@@ -187,18 +203,16 @@ def get_repayment_stats():
                 'on_time_percentage': on_time_pct
             },
             'financial_summary': {
-                'total_emi_due': float(total_emi_due),
-                'total_collected': float(total_collected),
-                'collection_efficiency': round(float(total_collected) / float(total_emi_due) * 100, 2) if float(total_emi_due) > 0 else 0,
-                'total_penalties': float(total_penalties)
+                'total_emi_due': total_emi_due,
+                'total_collected': total_collected,
+                'collection_efficiency': round(total_collected / total_emi_due * 100, 2) if total_emi_due > 0 else 0,
+                'total_penalties': total_penalties
             },
             'risk_indicators': {
-                'average_days_overdue': round(float(avg_days_overdue), 1),
+                'average_days_overdue': round(avg_days_overdue, 1),
                 'payment_status_distribution': status_distribution
             }
         }), 200
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        session.close()
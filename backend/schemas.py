@@ -0,0 +1,57 @@
+"""
+Request payload schemas for the Credit Risk API.
+
+msgspec decodes the raw JSON body straight into these typed structs,
+combining parsing and validation in a single pass. LoanFeatures is the
+internal scoring input built once per loan application.
+"""
+
+from datetime import date
+from typing import Optional
+
+import msgspec
+
+
+class EmploymentCreate(msgspec.Struct):
+    """Employment details submitted with a customer registration."""
+    employer_name: Optional[str] = None
+    employment_type: Optional[str] = None
+    designation: Optional[str] = None
+    monthly_income: float = 0
+    years_of_experience: float = 0
+    office_address: Optional[str] = None
+
+
+class CustomerCreate(msgspec.Struct):
+    """Body of POST /api/customers/."""
+    first_name: str
+    last_name: str
+    date_of_birth: date
+    email: str
+    phone: str
+    gender: Optional[str] = None
+    address: Optional[str] = None
+    city: Optional[str] = None
+    state: Optional[str] = None
+    pincode: Optional[str] = None
+    pan_number: Optional[str] = None
+    aadhar_number: Optional[str] = None
+    employment: Optional[EmploymentCreate] = None
+
+
+class LoanFeatures(msgspec.Struct, frozen=True):
+    """Model inputs for one loan application (shared by ML and rule-based scoring)."""
+    loan_amount: float
+    loan_tenure_months: int
+    interest_rate: float
+    monthly_income: float
+    annual_income: float
+    years_of_experience: float
+    age: float
+    estimated_emi: float
+    debt_to_income_ratio: float
+    loan_to_income_ratio: float
+    emi_to_income_ratio: float
+    loan_purpose: str
+    employment_type: Optional[str] = None
+    city: Optional[str] = None
@@ -9,9 +9,36 @@ Provides core financial formulas:
 - Credit score mapping
 """
 
+import bisect
+import functools
 import math
 
+import numpy as np
 
+# Threshold ladders, searched with bisect instead of if/elif chains.
+# Days overdue are whole days: 90-180 is Sub-Standard, 181-365 Doubtful.
+_NPA_EDGES = (90, 181, 366)
+_NPA_LABELS = ('Standard', 'Sub-Standard', 'Doubtful', 'Loss')
+
+_RISK_EDGES = (0.30, 0.60)
+_RISK_LABELS = ('Low', 'Medium', 'High')
+
+# Upper bounds are inclusive: 0.45 is still Approved, 0.60 still Pending
+_APPROVAL_EDGES = (0.45, 0.60)
+_APPROVAL_LABELS = ('Approved', 'Pending', 'Rejected')
+
+# Provisioning rates (RBI norms) by NPA category
+_PROVISION_RATES = {
+    'Standard': 0.004,
+    'Sub-Standard': 0.15,
+    'Doubtful': 0.40,
+    'Loss': 1.0
+}
+
+
+# Applications cluster around a handful of standard amount/rate/tenure
+# combinations, so repeated inputs are served from the cache
+@functools.lru_cache(maxsize=4096)
 def calculate_emi(principal, annual_rate, tenure_months):
     """
     Calculate Equated Monthly Installment using compound interest formula.
@@ -30,12 +57,29 @@ def calculate_emi(principal, annual_rate, tenure_months):
         return round(principal / tenure_months, 2)
 
     monthly_rate = annual_rate / (12 * 100)
-    numerator = principal * monthly_rate * math.pow(1 + monthly_rate, tenure_months)
-    denominator = math.pow(1 + monthly_rate, tenure_months) - 1
-    emi = numerator / denominator
+    # (1+r)^n - 1 via expm1/log1p: no cancellation at low rates
+    growth_minus_one = math.expm1(tenure_months * math.log1p(monthly_rate))
+    emi = principal * monthly_rate * (growth_minus_one + 1) / growth_minus_one
     return round(emi, 2)
 
 
+def calculate_age(date_of_birth, today):
+    """
+    Age in fractional years on `today` (days / 365.25, 1 decimal).
+
+    Must match the `age` training feature (see calculate_age_vec), so it
+    rounds with NumPy exactly as the array version does.
+
+    Args:
+        date_of_birth (date): Date of birth
+        today (date): Reference date (computed once per request/batch)
+
+    Returns:
+        float: Age in years, rounded to 1 decimal
+    """
+    return float(np.round((today - date_of_birth).days / 365.25, 1))
+
+
 def calculate_dti_ratio(monthly_emi, monthly_income):
     """
     Calculate Debt-to-Income ratio.
@@ -105,14 +149,7 @@ def classify_npa(days_overdue):
     Returns:
         str: NPA classification category
     """
-    if days_overdue < 90:
-        return 'Standard'
-    elif days_overdue <= 180:
-        return 'Sub-Standard'
-    elif days_overdue <= 365:
-        return 'Doubtful'
-    else:
-        return 'Loss'
+    return _NPA_LABELS[bisect.bisect_right(_NPA_EDGES, days_overdue)]
 
 
 def calculate_provision(outstanding_amount, npa_category):
@@ -132,16 +169,82 @@ def calculate_provision(outstanding_amount, npa_category):
     Returns:
         float: Required provision amount
     """
-    rates = {
-        'Standard': 0.004,
-        'Sub-Standard': 0.15,
-        'Doubtful': 0.40,
-        'Loss': 1.0
-    }
-    rate = rates.get(npa_category, 0.004)
+    rate = _PROVISION_RATES.get(npa_category, 0.004)
     return round(outstanding_amount * rate, 2)
 
 
+# ─── Vectorized variants for bulk scoring ───────────────────────
+
+def calculate_emi_vec(principal, annual_rate, tenure_months):
+    """
+    Array version of calculate_emi() — one EMI per element.
+
+    Args:
+        principal (array-like): Loan amounts in ₹
+        annual_rate (array-like): Annual interest rates (e.g., 9.5 for 9.5%)
+        tenure_months (array-like): Loan tenures in months
+
+    Returns:
+        np.ndarray: Monthly EMI amounts, rounded to 2 decimals
+    """
+    principal = np.asarray(principal, dtype=float)
+    tenure_months = np.asarray(tenure_months, dtype=float)
+    monthly_rate = np.asarray(annual_rate, dtype=float) / (12 * 100)
+
+    growth_minus_one = np.expm1(tenure_months * np.log1p(monthly_rate))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        emi = np.where(
+            monthly_rate == 0,
+            principal / tenure_months,
+            principal * monthly_rate * (growth_minus_one + 1) / growth_minus_one
+        )
+    return np.round(emi, 2)
+
+
+def calculate_age_vec(date_of_birth, today):
+    """
+    Array version of calculate_age() — used for the `age` training feature.
+
+    Args:
+        date_of_birth (array-like): Dates of birth (anything castable to datetime64[D])
+        today (date): Reference date
+
+    Returns:
+        np.ndarray: Ages in years, rounded to 1 decimal
+    """
+    days = np.datetime64(today, 'D') - np.asarray(date_of_birth, dtype='datetime64[D]')
+    return np.round(days.astype(np.int64) / 365.25, 1)
+
+
+def classify_npa_vec(days_overdue):
+    """
+    Array version of classify_npa().
+
+    Args:
+        days_overdue (array-like): Days overdue per loan
+
+    Returns:
+        np.ndarray: NPA category label per element
+    """
+    return np.asarray(_NPA_LABELS)[np.digitize(days_overdue, _NPA_EDGES)]
+
+
+def calculate_provision_vec(outstanding_amount, npa_category):
+    """
+    Array version of calculate_provision().
+
+    Args:
+        outstanding_amount (array-like): Outstanding amounts
+        npa_category (array-like): NPA category label per element
+
+    Returns:
+        np.ndarray: Required provision amounts, rounded to 2 decimals
+    """
+    categories, codes = np.unique(np.asarray(npa_category), return_inverse=True)
+    rates = np.array([_PROVISION_RATES.get(c, 0.004) for c in categories])
+    return np.round(np.asarray(outstanding_amount, dtype=float) * np.take(rates, codes), 2)
+
+
 def risk_probability_to_credit_score(risk_probability):
     """
     Map risk probability to credit score on 300-850 scale.
@@ -169,12 +272,24 @@ def get_risk_level(risk_probability):
     Returns:
         str: 'Low', 'Medium', or 'High'
     """
-    if risk_probability < 0.30:
-        return 'Low'
-    elif risk_probability < 0.60:
-        return 'Medium'
-    else:
-        return 'High'
+    return _RISK_LABELS[bisect.bisect_right(_RISK_EDGES, risk_probability)]
+
+
+def get_approval_status(risk_probability):
+    """
+    Decide the application status from risk probability.
+
+    - Approved: up to 0.45
+    - Pending (manual review): above 0.45 up to 0.60
+    - Rejected: above 0.60
+
+    Args:
+        risk_probability (float): Model output between 0 and 1
+
+    Returns:
+        str: 'Approved', 'Pending', or 'Rejected'
+    """
+    return _APPROVAL_LABELS[bisect.bisect_left(_APPROVAL_EDGES, risk_probability)]
 
 
 def generate_recommendation(risk_probability, dti_ratio, lti_ratio, credit_score):
@@ -9,19 +9,49 @@ DB_NAME = 'credit_risk_db'
 DB_USER = 'postgres'
 DB_PASSWORD = 'your_password_here'  # Change this!
 
-# SQLAlchemy connection string
+# SQLAlchemy connection string (API uses psycopg 3; scripts use psycopg2 directly)
 from urllib.parse import quote_plus as _qp
-DATABASE_URI = f'postgresql://{DB_USER}:{_qp(DB_PASSWORD)}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
+DATABASE_URI = f'postgresql+psycopg://{DB_USER}:{_qp(DB_PASSWORD)}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
 
-# Connection pool settings
-POOL_SIZE = 5
-MAX_OVERFLOW = 10
-POOL_TIMEOUT = 30
+# Server-side prepared statements after N executions of the same query
+PREPARE_THRESHOLD = 5
 
 # ─── API Configuration ──────────────────────────────────────────────
 API_HOST = '0.0.0.0'
 API_PORT = 5001
-DEBUG = True
+DEBUG = True                # Werkzeug dev server only; gunicorn never enables the debugger
+
+# Production WSGI server (see gunicorn.conf.py)
+WSGI_WORKERS = None         # None → 2 × CPU cores + 1, capped by DB_MAX_CONNECTIONS
+WSGI_THREADS = 4            # Requests served concurrently per worker
+
+# Connection pool settings (per worker process). A gthread worker never
+# checks out more than WSGI_THREADS connections at once, so the pool
+# matches the thread count; a host opens at most
+# workers × (POOL_SIZE + MAX_OVERFLOW) connections.
+POOL_SIZE = WSGI_THREADS
+MAX_OVERFLOW = 2            # Headroom beyond WSGI_THREADS (e.g. the threaded dev server)
+
+# Connections one API host may hold in total. The default worker count is
+# capped to fit (90 // 6 = 15 workers), leaving room under PostgreSQL's
+# default max_connections of 100 for the seeding/training scripts and psql
+DB_MAX_CONNECTIONS = 90
+POOL_TIMEOUT = 30
+POOL_RECYCLE = 1800         # Seconds before a pooled connection is replaced
+POOL_PRE_PING = True        # Test connections on checkout (drops stale NAT/idle-killed ones)
+
+# HTTP response compression (Flask-Compress)
+COMPRESS_MIMETYPES = ['application/json']
+COMPRESS_ALGORITHM = ['br', 'gzip']
+COMPRESS_LEVEL = 4          # gzip level — balanced speed/ratio
+COMPRESS_BR_LEVEL = 4
+COMPRESS_MIN_SIZE = 1024    # Bytes; smaller bodies are sent as-is
+COMPRESS_STREAMS = False    # Keep streamed lists streaming (cached hits are compressed)
+
+# In-process response cache TTLs (seconds)
+RESPONSE_CACHE_TTL = 5      # List endpoints (served with ETag / 304)
+HEALTH_CACHE_TTL = 1        # Readiness probe result
+PORTFOLIO_CACHE_TTL = 60    # Portfolio analytics aggregates
 
 # ─── ML Model Configuration ─────────────────────────────────────────
 import os
@@ -31,6 +61,10 @@ MODEL_DIR = os.path.join(BASE_DIR, 'ml', 'models')
 MODEL_PATH = os.path.join(MODEL_DIR, 'credit_model.pkl')
 FEATURE_COLUMNS_PATH = os.path.join(MODEL_DIR, 'feature_columns.pkl')
 
+# Classifier trained by ml/train_model.py: 'random_forest' or
+# 'hist_gradient_boosting' (histogram-binned, faster to train and score)
+MODEL_ALGORITHM = 'random_forest'
+
 # ─── Credit Score Configuration ──────────────────────────────────────
 CREDIT_SCORE_MIN = 300
 CREDIT_SCORE_MAX = 850
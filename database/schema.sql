@@ -20,6 +20,7 @@ CREATE TABLE customers (
     customer_id     SERIAL PRIMARY KEY,
     first_name      VARCHAR(100) NOT NULL,
     last_name       VARCHAR(100) NOT NULL,
+    full_name       VARCHAR(201) GENERATED ALWAYS AS (first_name || ' ' || last_name) STORED,
     date_of_birth   DATE NOT NULL,
     gender          VARCHAR(10) CHECK (gender IN ('Male', 'Female', 'Other')),
     email           VARCHAR(200) UNIQUE NOT NULL,
@@ -36,6 +37,7 @@ CREATE TABLE customers (
 
 CREATE INDEX idx_customers_email ON customers(email);
 CREATE INDEX idx_customers_city ON customers(city);
+CREATE INDEX idx_customers_full_name ON customers(full_name);
 
 -- ─── 2. EMPLOYMENT DETAILS ─────────────────────────────────────
 CREATE TABLE employment_details (
@@ -64,7 +66,11 @@ CREATE TABLE loan_applications (
     status              VARCHAR(20) DEFAULT 'Pending' CHECK (status IN ('Pending', 'Approved', 'Rejected')),
     credit_score        NUMERIC(6, 2),
     risk_probability    NUMERIC(6, 4),
-    risk_level          VARCHAR(20),
+    risk_level          VARCHAR(20) GENERATED ALWAYS AS (
+                            CASE WHEN risk_probability < 0.30 THEN 'Low'
+                                 WHEN risk_probability < 0.60 THEN 'Medium'
+                                 WHEN risk_probability IS NOT NULL THEN 'High'
+                            END) STORED,
     recommendation      TEXT,
     ml_model_version    VARCHAR(50),
     processing_time_ms  INTEGER,
@@ -75,6 +81,8 @@ CREATE TABLE loan_applications (
 CREATE INDEX idx_applications_customer ON loan_applications(customer_id);
 CREATE INDEX idx_applications_status ON loan_applications(status);
 CREATE INDEX idx_applications_date ON loan_applications(application_date);
+CREATE INDEX idx_applications_status_date ON loan_applications(status, application_date);
+CREATE INDEX idx_applications_customer_date ON loan_applications(customer_id, application_date DESC);
 
 -- ─── 4. LOANS ───────────────────────────────────────────────────
 CREATE TABLE loans (
@@ -98,6 +106,8 @@ CREATE TABLE loans (
 CREATE INDEX idx_loans_customer ON loans(customer_id);
 CREATE INDEX idx_loans_status ON loans(loan_status);
 CREATE INDEX idx_loans_application ON loans(application_id);
+CREATE INDEX idx_loans_outstanding_open ON loans(loan_status, outstanding_amount)
+    WHERE loan_status IN ('Active', 'Defaulted');
 
 -- ─── 5. DISBURSEMENTS ───────────────────────────────────────────
 CREATE TABLE disbursements (
@@ -131,6 +141,7 @@ CREATE TABLE repayments (
 CREATE INDEX idx_repayments_loan ON repayments(loan_id);
 CREATE INDEX idx_repayments_status ON repayments(payment_status);
 CREATE INDEX idx_repayments_due_date ON repayments(due_date);
+CREATE INDEX idx_repayments_status_due ON repayments(payment_status, due_date);
 
 -- ─── 7. COLLATERAL ──────────────────────────────────────────────
 CREATE TABLE collateral (
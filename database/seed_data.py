@@ -8,6 +8,7 @@ genuine financial patterns rather than spurious correlations.
 
 import sys
 import os
+import io
 import random
 import math
 from datetime import datetime, timedelta
@@ -16,12 +17,14 @@ from decimal import Decimal
 # Add project root to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+import numpy as np
 import psycopg2
-from psycopg2.extras import execute_batch
+from psycopg2.extras import execute_values
 import config
 
 # ─── Random seed for reproducibility ────────────────────────────────
 random.seed(42)
+rng = np.random.default_rng(42)
 
 # ─── Constants ───────────────────────────────────────────────────────
 INDIAN_FIRST_NAMES_MALE = [
@@ -70,6 +73,8 @@ EMPLOYERS = [
 
 EMPLOYMENT_TYPES = ['Salaried', 'Self-Employed', 'Business', 'Freelancer']
 EMPLOYMENT_TYPE_WEIGHTS = [0.55, 0.20, 0.15, 0.10]
+# Income multiplier range per employment type (same order as above)
+EMPLOYMENT_INCOME_MULTIPLIERS = [(0.9, 1.8), (0.8, 2.5), (1.2, 3.0), (0.6, 2.0)]
 
 LOAN_PURPOSES = [
     'Home Purchase', 'Home Renovation', 'Vehicle Loan', 'Education',
@@ -94,6 +99,38 @@ RELATIONSHIPS = [
     'Spouse', 'Parent', 'Sibling', 'Friend', 'Colleague', 'Business Partner'
 ]
 
+STREET_NAMES = [
+    'MG Road', 'Gandhi Nagar', 'Nehru Street', 'Park Avenue', 'Lake View Road',
+    'Temple Road', 'Station Road', 'Market Street'
+]
+
+SELF_EMPLOYED_SECTORS = ['Consulting', 'Trading', 'Manufacturing', 'Services', 'Retail']
+
+OFFICE_UNITS = ['Sector', 'Block', 'Wing']
+
+# Array views of the pools above, indexed with rng.integers batches
+_CITY_ARR = np.array(CITIES)
+_STREET_ARR = np.array(STREET_NAMES)
+_EMPLOYER_ARR = np.array(EMPLOYERS)
+_SECTOR_ARR = np.array(SELF_EMPLOYED_SECTORS)
+_DESIGNATION_ARR = np.array(DESIGNATIONS)
+_OFFICE_UNIT_ARR = np.array(OFFICE_UNITS)
+_EMPLOYMENT_TYPE_ARR = np.array(EMPLOYMENT_TYPES)
+
+# Name pools with lowercase twins for email local parts, indexed in step
+_MALE_NAMES = np.array(INDIAN_FIRST_NAMES_MALE)
+_FEMALE_NAMES = np.array(INDIAN_FIRST_NAMES_FEMALE)
+_LAST_NAMES = np.array(INDIAN_LAST_NAMES)
+_MALE_NAMES_LOWER = np.char.lower(_MALE_NAMES)
+_FEMALE_NAMES_LOWER = np.char.lower(_FEMALE_NAMES)
+_LAST_NAMES_LOWER = np.char.lower(_LAST_NAMES)
+_INCOME_MULT_LOW, _INCOME_MULT_HIGH = np.array(EMPLOYMENT_INCOME_MULTIPLIERS).T
+
+
+def _pick(pool, count):
+    """Draw `count` entries from a constant array pool in one call."""
+    return pool[rng.integers(0, len(pool), size=count)]
+
 
 def get_connection():
     """Create PostgreSQL database connection."""
@@ -106,138 +143,200 @@ def get_connection():
     )
 
 
-def generate_pan():
-    """Generate a realistic PAN number (XXXXX1234X format)."""
-    letters = ''.join(random.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ', k=5))
-    digits = ''.join(random.choices('0123456789', k=4))
-    last = random.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ')
-    return f"{letters}{digits}{last}"
+def _copy_value(value):
+    """Format one value for PostgreSQL COPY text format."""
+    if value is None:
+        return '\\N'
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
 
 
-def generate_aadhar():
-    """Generate a realistic Aadhar number (12-digit)."""
-    return ''.join(random.choices('0123456789', k=12))
+def copy_rows(cursor, table, columns, rows):
+    """
+    Bulk-load rows with COPY FROM STDIN.
+
+    Rows are rendered into an in-memory tab-delimited buffer and streamed
+    over the COPY protocol in one round trip, instead of one INSERT per row.
+    """
+    buf = io.StringIO()
+    for row in rows:
+        buf.write('\t'.join(map(_copy_value, row)))
+        buf.write('\n')
+    buf.seek(0)
+    cursor.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT text)", buf
+    )
 
 
-def generate_phone():
-    """Generate an Indian phone number."""
-    prefixes = ['9876', '9845', '9823', '9801', '9765', '9734', '9654', '9612', '9543', '9432']
-    return f"+91-{random.choice(prefixes)}{random.randint(100000, 999999)}"
+_LETTERS = np.array(list('ABCDEFGHIJKLMNOPQRSTUVWXYZ'))
+_DIGITS = np.array(list('0123456789'))
+
+
+def _unique_draws(draw, count):
+    """
+    Call draw(n) -> array of n candidates until `count` distinct values exist.
+
+    Duplicates are dropped with np.unique (first occurrence wins, original
+    order kept) and the shortfall is topped up with a fresh batch.
+    """
+    values = draw(int(count * 1.05) + 1)
+    while True:
+        _, first = np.unique(values, return_index=True)
+        values = values[np.sort(first)]
+        if len(values) >= count:
+            return values[:count]
+        values = np.concatenate([values, draw(count - len(values) + 16)])
+
+
+def generate_pans(count):
+    """Generate `count` unique, realistic PAN numbers (XXXXX1234X format)."""
+    def draw(n):
+        chars = np.concatenate([
+            _LETTERS[rng.integers(0, 26, size=(n, 5))],
+            _DIGITS[rng.integers(0, 10, size=(n, 4))],
+            _LETTERS[rng.integers(0, 26, size=(n, 1))]
+        ], axis=1)
+        return np.ascontiguousarray(chars).view('U10').ravel()
+    return _unique_draws(draw, count)
+
+
+def generate_aadhars(count):
+    """Generate `count` unique, realistic Aadhar numbers (12-digit)."""
+    def draw(n):
+        return np.char.zfill(rng.integers(0, 10**12, size=n).astype(str), 12)
+    return _unique_draws(draw, count)
+
+
+def generate_emails(first_names, last_names):
+    """
+    One email per already-lowercased (first, last) name pair, unique across
+    the batch.
+
+    Collisions are redrawn with a wider numeric suffix until none remain.
+    """
+    prefixes = np.char.add(np.char.add(first_names, '.'), last_names)
+    emails = np.char.add(np.char.add(prefixes, rng.integers(1, 1000, size=len(prefixes)).astype(str)), '@email.com')
+    emails = emails.astype(f'U{emails.itemsize // 4 + 1}')  # Room for 4-digit redraws
+    while True:
+        _, first = np.unique(emails, return_index=True)
+        dupes = np.setdiff1d(np.arange(len(emails)), first)
+        if len(dupes) == 0:
+            return emails
+        suffixes = rng.integers(1, 10000, size=len(dupes)).astype(str)
+        emails[dupes] = np.char.add(np.char.add(prefixes[dupes], suffixes), '@email.com')
+
+
+_PHONE_PREFIXES = np.array(['9876', '9845', '9823', '9801', '9765', '9734', '9654', '9612', '9543', '9432'])
+
+
+def generate_phones(count):
+    """Generate `count` Indian phone numbers."""
+    suffixes = rng.integers(100000, 1000000, size=count).astype(str)
+    return np.char.add(np.char.add('+91-', _pick(_PHONE_PREFIXES, count)), suffixes)
+
+
+def _numbered(prefixes, low, high, suffixes):
+    """Join prefix + random number in [low, high] + suffix element-wise."""
+    numbers = rng.integers(low, high + 1, size=len(suffixes)).astype(str)
+    return np.char.add(np.char.add(prefixes, numbers), suffixes)
 
 
 def calculate_emi(principal, annual_rate, tenure_months):
-    """Calculate EMI using the compound interest formula."""
-    if annual_rate == 0:
-        return principal / tenure_months
+    """Calculate EMIs (arrays) using the compound interest formula."""
     monthly_rate = annual_rate / (12 * 100)
-    emi = principal * monthly_rate * (1 + monthly_rate) ** tenure_months
-    emi /= ((1 + monthly_rate) ** tenure_months - 1)
-    return round(emi, 2)
+    growth = np.power(1 + monthly_rate, tenure_months)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        emi = np.where(
+            monthly_rate == 0,
+            principal / tenure_months,
+            principal * monthly_rate * growth / (growth - 1)
+        )
+    return np.round(emi, 2)
 
 
 def calculate_risk_probability(dti_ratio, lti_ratio, age, experience, income):
     """
     Causal risk probability — higher DTI and LTI directly increase default risk.
     This ensures the ML model learns genuine financial risk patterns.
+
+    All arguments are equal-length arrays; one probability is returned per row.
     """
-    # Base risk from DTI (primary factor — should dominate feature importance)
-    if dti_ratio > 0.50:
-        dti_risk = 0.80 + random.uniform(0, 0.15)
-    elif dti_ratio > 0.40:
-        dti_risk = 0.55 + random.uniform(0, 0.20)
-    elif dti_ratio > 0.30:
-        dti_risk = 0.30 + random.uniform(0, 0.15)
-    elif dti_ratio > 0.20:
-        dti_risk = 0.15 + random.uniform(0, 0.10)
-    else:
-        dti_risk = 0.05 + random.uniform(0, 0.08)
+    n = len(dti_ratio)
+
+    # Base risk from DTI (primary factor — should dominate feature importance):
+    # a per-bucket floor plus a uniform draw of per-bucket width
+    dti_buckets = [dti_ratio > 0.50, dti_ratio > 0.40, dti_ratio > 0.30, dti_ratio > 0.20]
+    dti_floor = np.select(dti_buckets, [0.80, 0.55, 0.30, 0.15], 0.05)
+    dti_width = np.select(dti_buckets, [0.15, 0.20, 0.15, 0.10], 0.08)
+    dti_risk = dti_floor + dti_width * rng.random(n)
 
     # LTI contribution (secondary factor)
-    if lti_ratio > 8:
-        lti_risk = 0.20
-    elif lti_ratio > 5:
-        lti_risk = 0.10
-    elif lti_ratio > 3:
-        lti_risk = 0.05
-    else:
-        lti_risk = 0.0
+    lti_risk = np.select([lti_ratio > 8, lti_ratio > 5, lti_ratio > 3], [0.20, 0.10, 0.05], 0.0)
 
     # Experience provides stability (negative risk factor)
-    exp_benefit = min(experience * 0.008, 0.10)
+    exp_benefit = np.minimum(experience * 0.008, 0.10)
 
     # Income stability factor
-    if income > 150000:
-        income_benefit = 0.08
-    elif income > 80000:
-        income_benefit = 0.04
-    else:
-        income_benefit = 0.0
+    income_benefit = np.select([income > 150000, income > 80000], [0.08, 0.04], 0.0)
 
     # Age factor (middle-aged = lower risk)
-    if 30 <= age <= 50:
-        age_benefit = 0.03
-    else:
-        age_benefit = 0.0
+    age_benefit = np.where((age >= 30) & (age <= 50), 0.03, 0.0)
 
     # Final risk (clamped between 0.02 and 0.98)
     risk = dti_risk + lti_risk - exp_benefit - income_benefit - age_benefit
-    risk += random.uniform(-0.05, 0.05)  # Small noise
-    return max(0.02, min(0.98, risk))
+    risk += rng.uniform(-0.05, 0.05, n)  # Small noise
+    return np.clip(risk, 0.02, 0.98)
 
 
 def risk_to_credit_score(risk_probability):
-    """Convert risk probability to credit score (300-850 scale)."""
+    """Convert risk probabilities (array) to credit scores (300-850 scale)."""
     # Inverse relationship: higher risk = lower score
     score = 850 - (risk_probability * 550)
-    return round(max(300, min(850, score + random.uniform(-15, 15))), 2)
+    noise = rng.uniform(-15, 15, len(risk_probability))
+    return np.round(np.clip(score + noise, 300, 850), 2)
 
 
 def seed_customers(cursor, count=1000):
     """Generate and insert customer records."""
     print(f"\n📋 Generating {count} customers...")
     customers = []
-    pans_used = set()
-    aadhars_used = set()
-    emails_used = set()
-
-    for i in range(count):
-        gender = random.choice(['Male', 'Female'])
-        if gender == 'Male':
-            first_name = random.choice(INDIAN_FIRST_NAMES_MALE)
-        else:
-            first_name = random.choice(INDIAN_FIRST_NAMES_FEMALE)
-        last_name = random.choice(INDIAN_LAST_NAMES)
-
-        # Ensure unique identifiers
-        pan = generate_pan()
-        while pan in pans_used:
-            pan = generate_pan()
-        pans_used.add(pan)
-
-        aadhar = generate_aadhar()
-        while aadhar in aadhars_used:
-            aadhar = generate_aadhar()
-        aadhars_used.add(aadhar)
-
-        email = f"{first_name.lower()}.{last_name.lower()}{random.randint(1, 999)}@email.com"
-        while email in emails_used:
-            email = f"{first_name.lower()}.{last_name.lower()}{random.randint(1, 9999)}@email.com"
-        emails_used.add(email)
-
-        city, state = random.choice(CITIES)
-        dob = datetime.now() - timedelta(days=random.randint(22 * 365, 60 * 365))
+
+    genders = rng.choice(['Male', 'Female'], size=count)
+    male = genders == 'Male'
+    male_idx = rng.integers(0, len(_MALE_NAMES), size=count)
+    female_idx = rng.integers(0, len(_FEMALE_NAMES), size=count)
+    last_idx = rng.integers(0, len(_LAST_NAMES), size=count)
+    first_names = np.where(male, _MALE_NAMES[male_idx], _FEMALE_NAMES[female_idx])
+    last_names = _LAST_NAMES[last_idx]
+
+    # Unique identifiers, generated and de-duplicated in bulk
+    pans = generate_pans(count)
+    aadhars = generate_aadhars(count)
+    emails = generate_emails(
+        np.where(male, _MALE_NAMES_LOWER[male_idx], _FEMALE_NAMES_LOWER[female_idx]),
+        _LAST_NAMES_LOWER[last_idx]
+    )
+
+    cities = _pick(_CITY_ARR, count)
+    phones = generate_phones(count)
+    addresses = _numbered('', 1, 500, np.char.add(', ', _pick(_STREET_ARR, count)))
+    dobs = np.datetime64(datetime.now().date(), 'D') - rng.integers(22 * 365, 60 * 365 + 1, size=count)
+
+    rows = zip(genders.tolist(), first_names.tolist(), last_names.tolist(),
+               pans.tolist(), aadhars.tolist(), emails.tolist(), dobs.tolist(),
+               cities[:, 0].tolist(), cities[:, 1].tolist(), phones.tolist(), addresses.tolist())
+    for gender, first_name, last_name, pan, aadhar, email, dob, city, state, phone, address in rows:
         pincode = str(random.randint(100000, 999999))
 
         customers.append((
-            first_name, last_name, dob.date(), gender, email,
-            generate_phone(), f"{random.randint(1, 500)}, {random.choice(['MG Road', 'Gandhi Nagar', 'Nehru Street', 'Park Avenue', 'Lake View Road', 'Temple Road', 'Station Road', 'Market Street'])}",
+            first_name, last_name, dob, gender, email,
+            phone, address,
             city, state, pincode, pan, aadhar
         ))
 
-    execute_batch(cursor,
-        """INSERT INTO customers (first_name, last_name, date_of_birth, gender, email,
-           phone, address, city, state, pincode, pan_number, aadhar_number)
-           VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)""",
+    copy_rows(cursor, 'customers',
+        ('first_name', 'last_name', 'date_of_birth', 'gender', 'email', 'phone',
+         'address', 'city', 'state', 'pincode', 'pan_number', 'aadhar_number'),
         customers
     )
     print(f"   ✓ Created {count} customers")
@@ -247,38 +346,35 @@ def seed_customers(cursor, count=1000):
 def seed_employment(cursor, customer_count=1000):
     """Generate and insert employment details for each customer."""
     print(f"\n💼 Generating employment details...")
-    employment = []
-
-    for cid in range(1, customer_count + 1):
-        emp_type = random.choices(EMPLOYMENT_TYPES, weights=EMPLOYMENT_TYPE_WEIGHTS, k=1)[0]
-        experience = round(random.uniform(0.5, 30), 2)
-
-        # Income correlated with experience and employment type
-        base_income = 25000 + experience * 3000
-        if emp_type == 'Business':
-            base_income *= random.uniform(1.2, 3.0)
-        elif emp_type == 'Self-Employed':
-            base_income *= random.uniform(0.8, 2.5)
-        elif emp_type == 'Freelancer':
-            base_income *= random.uniform(0.6, 2.0)
-        else:
-            base_income *= random.uniform(0.9, 1.8)
-
-        monthly_income = round(base_income + random.uniform(-5000, 15000), 2)
-        monthly_income = max(15000, monthly_income)  # Minimum income floor
 
-        employer = random.choice(EMPLOYERS) if emp_type == 'Salaried' else f"Self - {random.choice(['Consulting', 'Trading', 'Manufacturing', 'Services', 'Retail'])}"
-        designation = random.choice(DESIGNATIONS)
+    # Employment type, then income correlated with experience and type
+    type_idx = rng.choice(len(EMPLOYMENT_TYPES), p=EMPLOYMENT_TYPE_WEIGHTS, size=customer_count)
+    experience = np.round(rng.uniform(0.5, 30, customer_count), 2)
+    mult_low = _INCOME_MULT_LOW[type_idx]
+    mult_high = _INCOME_MULT_HIGH[type_idx]
+    base_income = (25000 + experience * 3000) * (mult_low + (mult_high - mult_low) * rng.random(customer_count))
+    monthly_income = np.round(base_income + rng.uniform(-5000, 15000, customer_count), 2)
+    monthly_income = np.maximum(15000, monthly_income)  # Minimum income floor
+
+    employers = np.where(
+        type_idx == EMPLOYMENT_TYPES.index('Salaried'),
+        _pick(_EMPLOYER_ARR, customer_count),
+        np.char.add('Self - ', _pick(_SECTOR_ARR, customer_count))
+    )
+    office_addresses = _numbered(
+        np.char.add(_pick(_OFFICE_UNIT_ARR, customer_count), ' '), 1, 50,
+        np.char.add(', ', _pick(_CITY_ARR, customer_count)[:, 0])
+    )
 
-        employment.append((
-            cid, employer, emp_type, designation, monthly_income, experience,
-            f"{random.choice(['Sector', 'Block', 'Wing'])} {random.randint(1, 50)}, {random.choice(CITIES)[0]}"
-        ))
+    employment = list(zip(
+        range(1, customer_count + 1), employers.tolist(),
+        _EMPLOYMENT_TYPE_ARR[type_idx].tolist(), _pick(_DESIGNATION_ARR, customer_count).tolist(),
+        monthly_income.tolist(), experience.tolist(), office_addresses.tolist()
+    ))
 
-    execute_batch(cursor,
-        """INSERT INTO employment_details (customer_id, employer_name, employment_type,
-           designation, monthly_income, years_of_experience, office_address)
-           VALUES (%s, %s, %s, %s, %s, %s, %s)""",
+    copy_rows(cursor, 'employment_details',
+        ('customer_id', 'employer_name', 'employment_type', 'designation',
+         'monthly_income', 'years_of_experience', 'office_address'),
         employment
     )
     print(f"   ✓ Created {customer_count} employment records")
@@ -291,100 +387,115 @@ def seed_applications_and_loans(cursor, customer_count=1000, app_count=1500):
     """
     print(f"\n📝 Generating {app_count} loan applications with causal risk logic...")
 
-    # Fetch customer income data for DTI calculations
-    cursor.execute("SELECT customer_id, monthly_income FROM employment_details")
-    income_map = {row[0]: float(row[1]) for row in cursor.fetchall()}
+    # Dense per-customer arrays indexed by customer_id (defaults for gaps),
+    # loaded from one joined scan
+    cursor.execute("""
+        SELECT c.customer_id, c.date_of_birth, e.monthly_income, e.years_of_experience
+        FROM customers c
+        LEFT JOIN employment_details e USING (customer_id)
+        WHERE c.customer_id <= %s
+    """, (customer_count,))
+    rows = cursor.fetchall()
+    ids = np.array([row[0] for row in rows], dtype=np.int64)
+    dobs = np.array([row[1] for row in rows], dtype='datetime64[D]')
+    incomes = np.array([row[2] for row in rows], dtype=np.float64)    # NULL → nan
+    experience = np.array([row[3] for row in rows], dtype=np.float64)
+
+    income_arr = np.full(customer_count + 1, 50000.0)
+    exp_arr = np.full(customer_count + 1, 5.0)
+    dob_arr = np.full(customer_count + 1, np.datetime64('1990-01-01'), dtype='datetime64[D]')
+    income_arr[ids] = np.where(np.isnan(incomes), 50000.0, incomes)
+    exp_arr[ids] = np.where(np.isnan(experience), 5.0, experience)
+    dob_arr[ids] = dobs
+
+    today = np.datetime64(datetime.now().date(), 'D')
+    age_arr = (today - dob_arr).astype(np.int64) / 365.25
+
+    # ─── Draw and score every application at once ───────────────
+    cids = rng.integers(1, customer_count + 1, size=app_count)
+    monthly_income = income_arr[cids]
+    annual_income = monthly_income * 12
+
+    # Loan amount varies — some deliberately high to create risky profiles:
+    # 30% high-risk (5-12x income), 35% medium (2-5x), 35% low (0.5-2x)
+    tier_draw = rng.random(app_count)
+    high = tier_draw < 0.30
+    medium = ~high & (rng.random(app_count) < 0.5)
+    low_mult = np.select([high, medium], [5.0, 2.0], 0.5)
+    high_mult = np.select([high, medium], [12.0, 5.0], 2.0)
+    multiplier = low_mult + (high_mult - low_mult) * rng.random(app_count)
+    loan_amount = np.maximum(100000, np.round(annual_income * multiplier, -3))  # Minimum loan amount
+
+    tenure = rng.choice([12, 24, 36, 48, 60, 72, 84, 120, 180, 240], size=app_count)
+    interest_rate = np.round(rng.uniform(7.5, 14.5, app_count), 2)
+    purposes = rng.choice(LOAN_PURPOSES, size=app_count)
+
+    # Calculate risk factors
+    emi = calculate_emi(loan_amount, interest_rate, tenure)
+    dti_ratio = emi / monthly_income
+    lti_ratio = loan_amount / annual_income
+
+    # Causal risk probability
+    risk_prob = calculate_risk_probability(
+        dti_ratio, lti_ratio, age_arr[cids], exp_arr[cids], monthly_income
+    )
+    credit_score = risk_to_credit_score(risk_prob)
 
-    # Fetch customer DOB for age calculation
-    cursor.execute("SELECT customer_id, date_of_birth FROM customers")
-    dob_map = {row[0]: row[1] for row in cursor.fetchall()}
+    # Decision based on risk
+    rejected = risk_prob > 0.60
+    pending = ~rejected & (risk_prob > 0.45) & (rng.random(app_count) < 0.4)
+    status = np.select([rejected, pending], ['Rejected', 'Pending'], 'Approved')
+    rejected_count = int(rejected.sum())
+    pending_count = int(pending.sum())
 
-    # Fetch experience data
-    cursor.execute("SELECT customer_id, years_of_experience FROM employment_details")
-    exp_map = {row[0]: float(row[1]) for row in cursor.fetchall()}
+    app_dates = (np.datetime64('2024-01-01', 'D') + rng.integers(0, 366, size=app_count))\
+        .astype('datetime64[s]')
+    processing_ms = rng.integers(50, 301, size=app_count)
 
+    # ─── Materialize rows (plain Python types for psycopg2) ─────
     applications = []
     approved_apps = []
-    rejected_count = 0
-    pending_count = 0
-    base_date = datetime(2024, 1, 1)
-
-    for i in range(app_count):
-        cid = random.randint(1, customer_count)
-        monthly_income = income_map.get(cid, 50000)
-        annual_income = monthly_income * 12
-
-        # Loan amount varies — some deliberately high to create risky profiles
-        if random.random() < 0.3:
-            # High-risk applications (30%)
-            loan_amount = round(annual_income * random.uniform(5, 12), -3)
-        elif random.random() < 0.5:
-            # Medium-risk applications (35%)
-            loan_amount = round(annual_income * random.uniform(2, 5), -3)
-        else:
-            # Low-risk applications (35%)
-            loan_amount = round(annual_income * random.uniform(0.5, 2), -3)
-
-        loan_amount = max(100000, loan_amount)  # Minimum loan amount
-        tenure = random.choice([12, 24, 36, 48, 60, 72, 84, 120, 180, 240])
-        interest_rate = round(random.uniform(7.5, 14.5), 2)
-        purpose = random.choice(LOAN_PURPOSES)
-
-        # Calculate risk factors
-        emi = calculate_emi(loan_amount, interest_rate, tenure)
-        dti_ratio = emi / monthly_income if monthly_income > 0 else 1.0
-        lti_ratio = loan_amount / annual_income if annual_income > 0 else 10.0
-
-        # Age calculation
-        dob = dob_map.get(cid, datetime(1990, 1, 1).date())
-        age = (datetime.now().date() - dob).days / 365.25
-        experience = exp_map.get(cid, 5)
-
-        # Causal risk probability
-        risk_prob = calculate_risk_probability(dti_ratio, lti_ratio, age, experience, monthly_income)
-        credit_score = risk_to_credit_score(risk_prob)
-
-        # Decision based on risk
-        if risk_prob > 0.60:
-            status = 'Rejected'
-            recommendation = f"High risk — DTI ratio ({dti_ratio:.1%}) exceeds safe threshold"
-            rejected_count += 1
-        elif risk_prob > 0.45 and random.random() < 0.4:
-            status = 'Pending'
+    rows = zip(
+        cids.tolist(), loan_amount.tolist(), tenure.tolist(), interest_rate.tolist(),
+        purposes.tolist(), app_dates.tolist(), status.tolist(), credit_score.tolist(),
+        risk_prob.tolist(), dti_ratio.tolist(), emi.tolist(), processing_ms.tolist()
+    )
+    for i, (cid, amount, months, rate, purpose, app_date, app_status, score,
+            prob, dti, app_emi, ms) in enumerate(rows):
+        if app_status == 'Rejected':
+            recommendation = f"High risk — DTI ratio ({dti:.1%}) exceeds safe threshold"
+        elif app_status == 'Pending':
             recommendation = "Moderate risk — requires manual review"
-            pending_count += 1
         else:
-            status = 'Approved'
             recommendation = "Low risk — strong financial profile"
 
-        app_date = base_date + timedelta(days=random.randint(0, 365))
-
         applications.append((
-            cid, loan_amount, tenure, interest_rate, purpose,
-            app_date, status, credit_score, round(risk_prob, 4),
-            'High' if risk_prob > 0.5 else 'Low',
-            recommendation, 'RF_v1.0', random.randint(50, 300)
+            cid, amount, months, rate, purpose,
+            app_date, app_status, score, round(prob, 4),
+            recommendation, 'RF_v1.0', ms
         ))
 
-        if status == 'Approved':
+        if app_status == 'Approved':
             approved_apps.append({
                 'index': i,
                 'customer_id': cid,
-                'loan_amount': loan_amount,
-                'tenure': tenure,
-                'interest_rate': interest_rate,
-                'emi': emi,
-                'risk_prob': risk_prob,
+                'loan_amount': amount,
+                'tenure': months,
+                'interest_rate': rate,
+                'emi': app_emi,
+                'risk_prob': prob,
                 'app_date': app_date
             })
 
-    execute_batch(cursor,
+    application_ids = [row[0] for row in execute_values(cursor,
         """INSERT INTO loan_applications (customer_id, loan_amount, loan_tenure_months,
            interest_rate, loan_purpose, application_date, status, credit_score,
-           risk_probability, risk_level, recommendation, ml_model_version, processing_time_ms)
-           VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)""",
-        applications
-    )
+           risk_probability, recommendation, ml_model_version, processing_time_ms)
+           VALUES %s RETURNING application_id""",
+        applications, page_size=1000, fetch=True
+    )]
+    for app in approved_apps:
+        app['application_id'] = application_ids[app['index']]
 
     approved_count = len(approved_apps)
     print(f"   ✓ Created {app_count} applications (Approved: {approved_count}, Rejected: {rejected_count}, Pending: {pending_count})")
@@ -392,116 +503,140 @@ def seed_applications_and_loans(cursor, customer_count=1000, app_count=1500):
     return approved_apps
 
 
+def build_repayments(plan):
+    """
+    Expand per-loan (start_date, emi, months_paid, will_default) into
+    monthly repayment rows, all loans at once.
+
+    Each row starts with its loan's index in `plan`. Month m of a loan falls
+    due 30·m days after the start date; the last three months before a
+    default are overdue and ~5% of the rest are paid late and partially.
+    """
+    if not plan:
+        return []
+    starts, emis, months_paid, defaulted = zip(*plan)
+    counts = np.maximum(np.array(months_paid, dtype=np.int64), 0)
+    total = int(counts.sum())
+
+    loan_idx = np.repeat(np.arange(len(plan)), counts)
+    month = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+    emi = np.array(emis, dtype=np.float64)[loan_idx]
+    due_date = np.array(starts, dtype='datetime64[D]')[loan_idx] + month * 30
+
+    overdue = np.array(defaulted, dtype=bool)[loan_idx] & (month > counts[loan_idx] - 3)
+    partial = ~overdue & (rng.random(total) < 0.05)
+    days_over = np.select(
+        [overdue, partial], [rng.integers(30, 181, total), rng.integers(1, 30, total)], 0
+    )
+    paid_share = np.select(
+        [overdue, partial], [rng.uniform(0, 0.5, total), rng.uniform(0.5, 0.9, total)], 1.0
+    )
+    status = np.select([overdue, partial], ['Overdue', 'Partial'], 'Paid')
+
+    return list(zip(
+        loan_idx.tolist(), due_date.tolist(), (due_date + days_over).tolist(),
+        np.round(emi, 2).tolist(), np.round(emi * 0.6, 2).tolist(), np.round(emi * 0.4, 2).tolist(),
+        np.round(emi * paid_share, 2).tolist(), status.tolist(), days_over.tolist(),
+        np.round(days_over * emi * 0.001, 2).tolist()  # Penalty
+    ))
+
+
 def seed_loans_and_related(cursor, approved_apps):
     """Create loans, disbursements, repayments, collateral, guarantors, and NPA tracking."""
     print(f"\n💰 Generating {len(approved_apps)} loans and related records...")
 
     loans = []
     disbursements = []
-    repayments = []
     collateral_records = []
     guarantor_records = []
     npa_records = []
     defaulted_count = 0
-    total_repayment_records = 0
-
+    today = np.datetime64(datetime.now().date(), 'D')
+
+    # Per-loan coin flips drawn up front, one array per decision
+    n = len(approved_apps)
+    tenures = np.array([app['tenure'] for app in approved_apps], dtype=np.int64)
+    app_dates = np.array([app['app_date'] for app in approved_apps], dtype='datetime64[D]')
+    start_dates = app_dates + rng.integers(3, 16, size=n)
+    end_dates = (start_dates + tenures * 30).tolist()
+    months_active = ((today - start_dates).astype(np.int64) // 30).tolist()
+    start_dates = start_dates.tolist()
+    default_flips = rng.random(n).tolist()
+    close_flips = rng.random(n).tolist()
+    default_months = rng.integers(3, np.minimum(tenures - 1, 18) + 1).tolist() if n else []
+    collateral_flips = rng.random(n).tolist()
+    guarantor_flips = rng.random(n).tolist()
+    guarantor_phones = generate_phones(n).tolist()
+    repayment_plan = []   # (start_date, emi, months_paid, will_default) per loan
+
+    # Single pass: every related record is generated alongside its loan, so
+    # nothing has to be re-simulated to work out which loan it belongs to
+    # (repayment schedules are only planned here and expanded in bulk after)
     for idx, app in enumerate(approved_apps):
-        app_id = idx + 1  # application_id is sequential
-        # Find the actual application_id for approved ones
         cid = app['customer_id']
         loan_amount = app['loan_amount']
         tenure = app['tenure']
         interest_rate = app['interest_rate']
         emi = app['emi']
         risk_prob = app['risk_prob']
-        start_date = app['app_date'] + timedelta(days=random.randint(3, 15))
+        start_date = start_dates[idx]
 
         # Determine if loan defaults (causal: high risk → more defaults)
-        will_default = random.random() < risk_prob * 0.25  # ~25% of high-risk approved loans default
+        will_default = default_flips[idx] < risk_prob * 0.25  # ~25% of high-risk approved loans default
         if will_default:
             defaulted_count += 1
             loan_status = 'Defaulted'
-            months_paid = random.randint(3, min(tenure - 1, 18))
+            months_paid = default_months[idx]
         else:
-            if random.random() < 0.15:
+            if close_flips[idx] < 0.15:
                 loan_status = 'Closed'
                 months_paid = tenure
             else:
                 loan_status = 'Active'
-                months_active = (datetime.now().date() - start_date.date()).days // 30
-                months_paid = min(months_active, tenure)
+                months_paid = min(months_active[idx], tenure)
 
         disbursed_amount = loan_amount
         total_paid = round(emi * months_paid, 2)
         outstanding = round(max(0, loan_amount - total_paid * 0.6), 2)  # Simplified outstanding
 
-        end_date = start_date + timedelta(days=tenure * 30)
-
         loans.append((
-            cid, loan_amount, disbursed_amount, interest_rate, tenure,
-            round(emi, 2), start_date.date(), end_date.date(),
+            app['application_id'], cid, loan_amount, disbursed_amount, interest_rate, tenure,
+            round(emi, 2), start_date, end_dates[idx],
             loan_status, outstanding, total_paid
         ))
 
+        # Related records carry their loan's index (idx) until loan_ids are known
         # Disbursement record
         disbursements.append((
-            start_date.date(), disbursed_amount,
+            idx, start_date, disbursed_amount,
             random.choice(PAYMENT_MODES),
             f"TXN{random.randint(100000000, 999999999)}"
         ))
 
-        # Generate repayment records
-        for month in range(1, months_paid + 1):
-            due_date = start_date + timedelta(days=30 * month)
-            principal_part = round(emi * 0.6, 2)
-            interest_part = round(emi * 0.4, 2)
-
-            if will_default and month > months_paid - 3:
-                # Last few months before default — overdue
-                days_over = random.randint(30, 180)
-                pay_status = 'Overdue'
-                amount_paid = round(emi * random.uniform(0, 0.5), 2)
-            elif random.random() < 0.05:
-                # Occasional late payment
-                days_over = random.randint(1, 29)
-                pay_status = 'Partial'
-                amount_paid = round(emi * random.uniform(0.5, 0.9), 2)
-            else:
-                days_over = 0
-                pay_status = 'Paid'
-                amount_paid = round(emi, 2)
-
-            payment_date = due_date + timedelta(days=days_over) if pay_status != 'Pending' else None
-
-            repayments.append((
-                due_date.date(),
-                payment_date.date() if payment_date else None,
-                round(emi, 2), principal_part, interest_part,
-                amount_paid, pay_status, days_over,
-                round(days_over * emi * 0.001, 2)  # Penalty
-            ))
-            total_repayment_records += 1
+        repayment_plan.append((start_date, emi, months_paid, will_default))
 
         # Collateral (60% of loans have collateral)
-        if random.random() < 0.60:
+        if collateral_flips[idx] < 0.60:
             coll_type = random.choice(COLLATERAL_TYPES)
             coll_value = round(loan_amount * random.uniform(1.1, 2.0), 2)
             collateral_records.append((
-                coll_type, f"{coll_type} provided as security",
-                coll_value, start_date.date()
+                idx, coll_type, f"{coll_type} provided as security",
+                coll_value, start_date
             ))
 
         # Guarantor (30% of loans have guarantor)
-        if random.random() < 0.30:
+        if guarantor_flips[idx] < 0.30:
             g_gender = random.choice(['Male', 'Female'])
             if g_gender == 'Male':
-                g_name = f"{random.choice(INDIAN_FIRST_NAMES_MALE)} {random.choice(INDIAN_LAST_NAMES)}"
+                first_pool, first_lower = INDIAN_FIRST_NAMES_MALE, _MALE_NAMES_LOWER
             else:
-                g_name = f"{random.choice(INDIAN_FIRST_NAMES_FEMALE)} {random.choice(INDIAN_LAST_NAMES)}"
+                first_pool, first_lower = INDIAN_FIRST_NAMES_FEMALE, _FEMALE_NAMES_LOWER
+            g_first = random.randrange(len(first_pool))
+            g_name = f"{first_pool[g_first]} {random.choice(INDIAN_LAST_NAMES)}"
             guarantor_records.append((
-                g_name, random.choice(RELATIONSHIPS),
-                generate_phone(),
-                f"{g_name.split()[0].lower()}.guarantor@email.com",
+                idx, g_name, random.choice(RELATIONSHIPS),
+                guarantor_phones[idx],
+                f"{first_lower[g_first]}.guarantor@email.com",
                 round(random.uniform(30000, 200000), 2),
                 f"{random.choice(CITIES)[0]}, India"
             ))
@@ -520,115 +655,49 @@ def seed_loans_and_related(cursor, approved_apps):
                 provision = round(outstanding * 1.0, 2)
 
             npa_records.append((
-                (start_date + timedelta(days=months_paid * 30 + 90)).date(),
+                idx, start_date + timedelta(days=months_paid * 30 + 90),
                 days_over, outstanding, npa_cat, provision,
                 random.choice(['Open', 'Resolved']),
                 f"Loan defaulted after {months_paid} EMI payments"
             ))
 
-    # Insert loans (we need loan_ids for related tables)
-    cursor.execute("SELECT COALESCE(MAX(application_id), 0) FROM loan_applications WHERE status = 'Approved'")
-
-    # Insert loans first
-    loan_insert = """INSERT INTO loans (customer_id, loan_amount, disbursed_amount,
-        interest_rate, tenure_months, emi_amount, loan_start_date, loan_end_date,
-        loan_status, outstanding_amount, total_paid)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s) RETURNING loan_id"""
-
-    loan_ids = []
-    for loan_data in loans:
-        cursor.execute(loan_insert, loan_data)
-        lid = cursor.fetchone()[0]
-        loan_ids.append(lid)
-
-    # Also link loans to applications
-    cursor.execute("""SELECT application_id FROM loan_applications WHERE status = 'Approved' ORDER BY application_id""")
-    approved_app_ids = [row[0] for row in cursor.fetchall()]
-
-    for i, lid in enumerate(loan_ids):
-        if i < len(approved_app_ids):
-            cursor.execute("UPDATE loans SET application_id = %s WHERE loan_id = %s",
-                         (approved_app_ids[i], lid))
-
-    # Insert disbursements
-    for i, disb in enumerate(disbursements):
-        if i < len(loan_ids):
-            cursor.execute(
-                """INSERT INTO disbursements (loan_id, disbursement_date, amount, payment_mode, reference_number)
-                   VALUES (%s, %s, %s, %s, %s)""",
-                (loan_ids[i], *disb)
-            )
-
-    # Insert repayments — map them to loan_ids
-    rep_idx = 0
-    for i, app in enumerate(approved_apps):
-        if i >= len(loan_ids):
-            break
-        lid = loan_ids[i]
-        risk_prob = app['risk_prob']
-        will_default = random.Random(42 + i).random() < risk_prob * 0.25
-        tenure = app['tenure']
-
-        if will_default:
-            months_paid = random.Random(42 + i).randint(3, min(tenure - 1, 18))
-        elif random.Random(42 + i).random() < 0.15:
-            months_paid = tenure
-        else:
-            start_date = app['app_date'] + timedelta(days=random.Random(42 + i).randint(3, 15))
-            months_active = (datetime.now().date() - start_date.date()).days // 30
-            months_paid = min(months_active, tenure)
-
-        for _ in range(months_paid):
-            if rep_idx < len(repayments):
-                rep = repayments[rep_idx]
-                cursor.execute(
-                    """INSERT INTO repayments (loan_id, due_date, payment_date, emi_amount,
-                       principal_component, interest_component, amount_paid, payment_status,
-                       days_overdue, penalty_amount)
-                       VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)""",
-                    (lid, *rep)
-                )
-                rep_idx += 1
-
-    # Insert collateral
-    coll_idx = 0
-    for i, lid in enumerate(loan_ids):
-        if coll_idx < len(collateral_records):
-            if random.Random(42 + i).random() < 0.60:
-                cursor.execute(
-                    """INSERT INTO collateral (loan_id, collateral_type, description, estimated_value, valuation_date)
-                       VALUES (%s, %s, %s, %s, %s)""",
-                    (lid, *collateral_records[coll_idx])
-                )
-                coll_idx += 1
-
-    # Insert guarantors
-    guar_idx = 0
-    for i, lid in enumerate(loan_ids):
-        if guar_idx < len(guarantor_records):
-            if random.Random(42 + i).random() < 0.30:
-                cursor.execute(
-                    """INSERT INTO guarantors (loan_id, full_name, relationship, phone, email, monthly_income, address)
-                       VALUES (%s, %s, %s, %s, %s, %s, %s)""",
-                    (lid, *guarantor_records[guar_idx])
-                )
-                guar_idx += 1
-
-    # Insert NPA records
-    npa_loan_ids = [loan_ids[i] for i in range(len(loan_ids))
-                    if i < len(loans) and loans[i][8] == 'Defaulted']
-    for i, npa in enumerate(npa_records):
-        if i < len(npa_loan_ids):
-            cursor.execute(
-                """INSERT INTO npa_tracking (loan_id, npa_date, days_overdue, outstanding_amount,
-                   npa_category, provision_amount, resolution_status, notes)
-                   VALUES (%s, %s, %s, %s, %s, %s, %s, %s)""",
-                (npa_loan_ids[i], *npa)
-            )
+    repayments = build_repayments(repayment_plan)
+
+    # Insert loans (we need loan_ids for related tables) — multi-row
+    # VALUES returns ids in input order
+    loan_ids = [row[0] for row in execute_values(cursor,
+        """INSERT INTO loans (application_id, customer_id, loan_amount, disbursed_amount,
+           interest_rate, tenure_months, emi_amount, loan_start_date, loan_end_date,
+           loan_status, outstanding_amount, total_paid)
+           VALUES %s RETURNING loan_id""",
+        loans, page_size=1000, fetch=True
+    )]
+
+    # Bulk-load related tables, swapping each record's loan index for its loan_id
+    def with_loan_ids(records):
+        return [(loan_ids[rec[0]], *rec[1:]) for rec in records]
+
+    copy_rows(cursor, 'disbursements',
+        ('loan_id', 'disbursement_date', 'amount', 'payment_mode', 'reference_number'),
+        with_loan_ids(disbursements))
+    copy_rows(cursor, 'repayments',
+        ('loan_id', 'due_date', 'payment_date', 'emi_amount', 'principal_component',
+         'interest_component', 'amount_paid', 'payment_status', 'days_overdue', 'penalty_amount'),
+        with_loan_ids(repayments))
+    copy_rows(cursor, 'collateral',
+        ('loan_id', 'collateral_type', 'description', 'estimated_value', 'valuation_date'),
+        with_loan_ids(collateral_records))
+    copy_rows(cursor, 'guarantors',
+        ('loan_id', 'full_name', 'relationship', 'phone', 'email', 'monthly_income', 'address'),
+        with_loan_ids(guarantor_records))
+    copy_rows(cursor, 'npa_tracking',
+        ('loan_id', 'npa_date', 'days_overdue', 'outstanding_amount', 'npa_category',
+         'provision_amount', 'resolution_status', 'notes'),
+        with_loan_ids(npa_records))
 
     print(f"   ✓ Created {len(loans)} loans ({defaulted_count} defaulted based on risk probability)")
     print(f"   ✓ Created {len(disbursements)} disbursement records")
-    print(f"   ✓ Created {total_repayment_records} repayment records")
+    print(f"   ✓ Created {len(repayments)} repayment records")
     print(f"   ✓ Created {len(collateral_records)} collateral records")
     print(f"   ✓ Created {len(guarantor_records)} guarantor records")
     print(f"   ✓ Created {len(npa_records)} NPA tracking records")
@@ -653,6 +722,10 @@ def main():
         conn.autocommit = False
         cursor = conn.cursor()
 
+        # Synthetic data needs no durability guarantee: skip the WAL flush
+        # wait on commit for this transaction only
+        cursor.execute("SET LOCAL synchronous_commit = off")
+
         # Phase 1: Customers
         customer_count = seed_customers(cursor, count=1000)
 
@@ -0,0 +1,36 @@
+"""
+Shared HTTP client for the Streamlit pages.
+
+One requests.Session is kept per Streamlit server process, so API calls
+from every page and rerun reuse pooled keep-alive connections instead of
+opening a new TCP connection each time.
+"""
+
+import os
+
+import orjson
+import requests
+import streamlit as st
+
+# Base URL of the Flask API, shared by every page; override with
+# CREDIT_RISK_API_URL when the backend is not on localhost:5001
+API_BASE_URL = os.environ.get("CREDIT_RISK_API_URL", "http://localhost:5001/api").rstrip("/")
+
+# Seconds to wait for the TCP connect, so a dead backend fails fast
+# instead of waiting out the full read timeout
+CONNECT_TIMEOUT = 3
+
+
+@st.cache_resource
+def get_http():
+    """Return the process-wide requests.Session for talking to the API."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=1)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def parse_json(response):
+    """Decode a JSON response body with orjson ({} for an empty body)."""
+    return orjson.loads(response.content) if response.content else {}
@@ -8,56 +8,157 @@ Displays comprehensive portfolio health metrics including:
 - Visual analytics with Plotly charts
 """
 
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
 import requests
 import plotly.graph_objects as go
 import plotly.express as px
 
+from frontend.http_client import API_BASE_URL, CONNECT_TIMEOUT, get_http, parse_json
+
 # ─── Page Configuration ──────────────────────────────────────────
 st.set_page_config(page_title="Admin Dashboard", page_icon="📊", layout="wide")
 
-API_BASE_URL = "http://localhost:5001/api"
-
 st.title("📊 Admin Dashboard")
 st.markdown("Real-time portfolio health monitoring and risk analytics.")
 st.divider()
 
 
+DASHBOARD_ENDPOINTS = ("portfolio/summary", "portfolio/npa-analysis", "portfolio/repayment-stats")
+
+
 def fetch_data(endpoint):
-    """Fetch data from the Flask API."""
-    try:
-        response = requests.get(f"{API_BASE_URL}/{endpoint}", timeout=10)
-        if response.status_code == 200:
-            return response.json()
-        return None
-    except requests.exceptions.ConnectionError:
-        return None
+    """Fetch data from the Flask API (None on a non-200 response)."""
+    response = get_http().get(f"{API_BASE_URL}/{endpoint}", timeout=(CONNECT_TIMEOUT, 10))
+    if response.status_code == 200:
+        return parse_json(response)
+    return None
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def fetch_dashboard():
+    """
+    Fetch every dashboard endpoint concurrently, cached across reruns.
+
+    Returns one result per DASHBOARD_ENDPOINTS entry. Connection errors
+    propagate (and so are never cached); they double as the API
+    reachability check.
+    """
+    with ThreadPoolExecutor(max_workers=len(DASHBOARD_ENDPOINTS)) as pool:
+        return list(pool.map(fetch_data, DASHBOARD_ENDPOINTS))
+
+
+# ─── Chart builders ──────────────────────────────────────────────
+# Pure functions of the fetched numbers, cached as figure dicts so reruns
+# with unchanged data skip Plotly figure construction.
+@st.cache_data(show_spinner=False)
+def build_status_pie(active, closed, defaulted):
+    """Loan status distribution donut."""
+    labels = ['Active', 'Closed', 'Defaulted']
+    values = [active, closed, defaulted]
+    colors = ['#66bb6a', '#42a5f5', '#ef5350']
 
+    fig = go.Figure(data=[go.Pie(
+        labels=labels, values=values,
+        hole=0.45,
+        marker_colors=colors,
+        textfont_size=14,
+        textinfo='label+percent'
+    )])
+    fig.update_layout(
+        height=350, margin=dict(t=30, b=10, l=10, r=10),
+        template='plotly_white',
+        showlegend=True
+    )
+    return fig.to_dict()
 
-# ─── Check API connectivity ──────────────────────────────────────
-try:
-    health = requests.get("http://localhost:5001/health", timeout=5)
-    api_connected = health.status_code == 200
-except Exception:
-    api_connected = False
 
-if not api_connected:
+@st.cache_data(show_spinner=False)
+def build_financial_bar(disbursed, outstanding, repaid, npa_amount):
+    """Portfolio amounts in crores."""
+    categories = ['Disbursed', 'Outstanding', 'Repaid', 'NPA Amount']
+    amounts = [a / 10000000 for a in (disbursed, outstanding, repaid, npa_amount)]
+    colors = ['#5c6bc0', '#ffa726', '#66bb6a', '#ef5350']
+
+    fig = go.Figure(data=[go.Bar(
+        x=categories, y=amounts,
+        marker_color=colors,
+        text=[f"₹{a:.1f} Cr" for a in amounts],
+        textposition='outside'
+    )])
+    fig.update_layout(
+        yaxis_title="Amount (₹ Crores)",
+        height=350, margin=dict(t=30, b=10, l=10, r=10),
+        template='plotly_white'
+    )
+    return fig.to_dict()
+
+
+@st.cache_data(show_spinner=False)
+def build_npa_bar(categories, counts, percentages):
+    """Loan counts per NPA category, labelled with their share."""
+    npa_colors = {
+        'Standard': '#66bb6a',
+        'Sub-Standard': '#ffa726',
+        'Doubtful': '#ef5350',
+        'Loss': '#b71c1c'
+    }
+
+    fig = go.Figure(data=[go.Bar(
+        x=categories, y=counts,
+        marker_color=[npa_colors.get(c, '#999') for c in categories],
+        text=[f"{p:.1f}%" for p in percentages],
+        textposition='outside'
+    )])
+    fig.update_layout(
+        yaxis_title="Number of Loans",
+        height=350, margin=dict(t=30, b=10, l=10, r=10),
+        template='plotly_white'
+    )
+    return fig.to_dict()
+
+
+@st.cache_data(show_spinner=False)
+def build_payment_status_pie(on_time, overdue, partial, pending):
+    """Repayment status distribution donut."""
+    statuses = ['On-Time', 'Overdue', 'Partial', 'Pending']
+    status_counts = [on_time, overdue, partial, pending]
+    status_colors = ['#66bb6a', '#ef5350', '#ffa726', '#bdbdbd']
+
+    fig = go.Figure(data=[go.Pie(
+        labels=statuses, values=status_counts,
+        hole=0.4,
+        marker_colors=status_colors,
+        textinfo='label+percent'
+    )])
+    fig.update_layout(
+        height=350, margin=dict(t=30, b=10, l=10, r=10),
+        template='plotly_white'
+    )
+    return fig.to_dict()
+
+
+# ─── Manual refresh ──────────────────────────────────────────────
+if st.sidebar.button("🔄 Refresh", use_container_width=True):
+    fetch_dashboard.clear()
+
+# ─── Fetch All Data ──────────────────────────────────────────────
+try:
+    with st.spinner("Loading dashboard data..."):
+        summary, npa_data, repayment_data = fetch_dashboard()
+except requests.exceptions.RequestException:
     st.error("""
     ❌ **Cannot connect to the API server.**
 
     Please start the Flask backend first:
     ```
-    python backend/app.py
+    python -m backend.app
     ```
+    The package must be installed first (`pip install -e .` from the repo root).
     """)
     st.stop()
 
-# ─── Fetch All Data ──────────────────────────────────────────────
-with st.spinner("Loading dashboard data..."):
-    summary = fetch_data("portfolio/summary")
-    npa_data = fetch_data("portfolio/npa-analysis")
-    repayment_data = fetch_data("portfolio/repayment-stats")
-
 if not summary:
     st.error("Failed to fetch portfolio data. Please check the API.")
     st.stop()
@@ -67,54 +168,83 @@ if not summary:
 # ───────────────────────────────────────────────────────────────────
 st.header("🎯 Key Performance Indicators")
 
+
+@st.fragment(run_every=30)
+def render_kpis():
+    """
+    KPI rows and alert banner, refreshed on their own every 30 seconds.
+
+    Each tick re-fetches the portfolio summary directly, bypassing the
+    fetch_dashboard() cache. Only this fragment reruns on the timer; the
+    charts below update on a full rerun (any widget interaction or the
+    Refresh button).
+    """
+    try:
+        summary = fetch_data("portfolio/summary")
+    except requests.exceptions.RequestException:
+        st.warning("⚠️ Lost connection to the API. KPIs will reappear once it is back.")
+        return
+    if not summary:
+        return
+
+    loan_stats = summary.get('loan_statistics', {})
+    fin_metrics = summary.get('financial_metrics', {})
+    risk_metrics = summary.get('risk_metrics', {})
+
+    # Row 1: Loan KPIs
+    k1, k2, k3, k4 = st.columns(4)
+    with k1:
+        st.metric("Total Applications", f"{loan_stats.get('total_applications', 0):,}")
+    with k2:
+        st.metric("Active Loans", f"{loan_stats.get('active_loans', 0):,}")
+    with k3:
+        st.metric("Approval Rate", f"{loan_stats.get('approval_rate', 0):.1f}%")
+    with k4:
+        default_rate = risk_metrics.get('default_rate', 0)
+        st.metric("Default Rate", f"{default_rate:.1f}%",
+                 delta="⚠️ Above threshold" if default_rate > 10 else "✅ Normal",
+                 delta_color="inverse" if default_rate > 10 else "normal")
+
+    # Row 2: Financial KPIs
+    k5, k6, k7, k8 = st.columns(4)
+    with k5:
+        disbursed = fin_metrics.get('total_disbursed', 0)
+        st.metric("Total Disbursed", f"₹{disbursed / 10000000:.1f} Cr")
+    with k6:
+        outstanding = fin_metrics.get('total_outstanding', 0)
+        st.metric("Outstanding", f"₹{outstanding / 10000000:.1f} Cr")
+    with k7:
+        npa_ratio = risk_metrics.get('npa_ratio', 0)
+        st.metric("NPA Ratio", f"{npa_ratio:.1f}%",
+                 delta="🚨 Critical" if npa_ratio > 5 else "✅ Healthy",
+                 delta_color="inverse" if npa_ratio > 5 else "normal")
+    with k8:
+        payment_rate = risk_metrics.get('average_emi_payment_rate', 0)
+        st.metric("EMI Payment Rate", f"{payment_rate:.1f}%")
+
+    # ─── Alert Banner ───────────────────────────────────────────────
+    alerts = []
+    if npa_ratio > 5:
+        alerts.append(f"⚠️ NPA Ratio ({npa_ratio:.1f}%) exceeds regulatory threshold of 5%")
+    if default_rate > 10:
+        alerts.append(f"⚠️ Default Rate ({default_rate:.1f}%) exceeds threshold of 10%")
+    if payment_rate < 80:
+        alerts.append(f"⚠️ EMI Payment Rate ({payment_rate:.1f}%) is below 80%")
+
+    if alerts:
+        st.divider()
+        for alert in alerts:
+            st.warning(alert)
+
+    # The API caches the aggregates briefly, so show when they were computed
+    if summary.get('generated_at'):
+        st.caption(f"Figures as of {summary['generated_at']}")
+
+
+render_kpis()
+
 loan_stats = summary.get('loan_statistics', {})
 fin_metrics = summary.get('financial_metrics', {})
-risk_metrics = summary.get('risk_metrics', {})
-
-# Row 1: Loan KPIs
-k1, k2, k3, k4 = st.columns(4)
-with k1:
-    st.metric("Total Applications", f"{loan_stats.get('total_applications', 0):,}")
-with k2:
-    st.metric("Active Loans", f"{loan_stats.get('active_loans', 0):,}")
-with k3:
-    st.metric("Approval Rate", f"{loan_stats.get('approval_rate', 0):.1f}%")
-with k4:
-    default_rate = risk_metrics.get('default_rate', 0)
-    st.metric("Default Rate", f"{default_rate:.1f}%",
-             delta="⚠️ Above threshold" if default_rate > 10 else "✅ Normal",
-             delta_color="inverse" if default_rate > 10 else "normal")
-
-# Row 2: Financial KPIs
-k5, k6, k7, k8 = st.columns(4)
-with k5:
-    disbursed = fin_metrics.get('total_disbursed', 0)
-    st.metric("Total Disbursed", f"₹{disbursed / 10000000:.1f} Cr")
-with k6:
-    outstanding = fin_metrics.get('total_outstanding', 0)
-    st.metric("Outstanding", f"₹{outstanding / 10000000:.1f} Cr")
-with k7:
-    npa_ratio = risk_metrics.get('npa_ratio', 0)
-    st.metric("NPA Ratio", f"{npa_ratio:.1f}%",
-             delta="🚨 Critical" if npa_ratio > 5 else "✅ Healthy",
-             delta_color="inverse" if npa_ratio > 5 else "normal")
-with k8:
-    payment_rate = risk_metrics.get('average_emi_payment_rate', 0)
-    st.metric("EMI Payment Rate", f"{payment_rate:.1f}%")
-
-# ─── Alert Banner ───────────────────────────────────────────────
-alerts = []
-if npa_ratio > 5:
-    alerts.append(f"⚠️ NPA Ratio ({npa_ratio:.1f}%) exceeds regulatory threshold of 5%")
-if default_rate > 10:
-    alerts.append(f"⚠️ Default Rate ({default_rate:.1f}%) exceeds threshold of 10%")
-if payment_rate < 80:
-    alerts.append(f"⚠️ EMI Payment Rate ({payment_rate:.1f}%) is below 80%")
-
-if alerts:
-    st.divider()
-    for alert in alerts:
-        st.warning(alert)
 
 st.divider()
 
@@ -129,53 +259,24 @@ vis_col1, vis_col2 = st.columns(2)
 with vis_col1:
     st.subheader("Loan Status Distribution")
 
-    labels = ['Active', 'Closed', 'Defaulted']
-    values = [
+    fig = build_status_pie(
         loan_stats.get('active_loans', 0),
         loan_stats.get('closed_loans', 0),
         loan_stats.get('defaulted_loans', 0)
-    ]
-    colors = ['#66bb6a', '#42a5f5', '#ef5350']
-
-    fig = go.Figure(data=[go.Pie(
-        labels=labels, values=values,
-        hole=0.45,
-        marker_colors=colors,
-        textfont_size=14,
-        textinfo='label+percent'
-    )])
-    fig.update_layout(
-        height=350, margin=dict(t=30, b=10, l=10, r=10),
-        template='plotly_white',
-        showlegend=True
     )
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(go.Figure(fig), use_container_width=True)
 
 # ─── Financial Breakdown (Bar Chart) ────────────────────────────
 with vis_col2:
     st.subheader("Financial Breakdown")
 
-    categories = ['Disbursed', 'Outstanding', 'Repaid', 'NPA Amount']
-    amounts = [
-        fin_metrics.get('total_disbursed', 0) / 10000000,
-        fin_metrics.get('total_outstanding', 0) / 10000000,
-        fin_metrics.get('total_repaid', 0) / 10000000,
-        fin_metrics.get('total_npa_amount', 0) / 10000000
-    ]
-    colors = ['#5c6bc0', '#ffa726', '#66bb6a', '#ef5350']
-
-    fig = go.Figure(data=[go.Bar(
-        x=categories, y=amounts,
-        marker_color=colors,
-        text=[f"₹{a:.1f} Cr" for a in amounts],
-        textposition='outside'
-    )])
-    fig.update_layout(
-        yaxis_title="Amount (₹ Crores)",
-        height=350, margin=dict(t=30, b=10, l=10, r=10),
-        template='plotly_white'
+    fig = build_financial_bar(
+        fin_metrics.get('total_disbursed', 0),
+        fin_metrics.get('total_outstanding', 0),
+        fin_metrics.get('total_repaid', 0),
+        fin_metrics.get('total_npa_amount', 0)
     )
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(go.Figure(fig), use_container_width=True)
 
 st.divider()
 
@@ -193,28 +294,12 @@ if npa_data:
         st.subheader("NPA Classification")
 
         categories = list(npa_classification.keys())
-        counts = [npa_classification[c]['count'] for c in categories]
-        percentages = [npa_classification[c]['percentage'] for c in categories]
-
-        npa_colors = {
-            'Standard': '#66bb6a',
-            'Sub-Standard': '#ffa726',
-            'Doubtful': '#ef5350',
-            'Loss': '#b71c1c'
-        }
-
-        fig = go.Figure(data=[go.Bar(
-            x=categories, y=counts,
-            marker_color=[npa_colors.get(c, '#999') for c in categories],
-            text=[f"{p:.1f}%" for p in percentages],
-            textposition='outside'
-        )])
-        fig.update_layout(
-            yaxis_title="Number of Loans",
-            height=350, margin=dict(t=30, b=10, l=10, r=10),
-            template='plotly_white'
+        fig = build_npa_bar(
+            tuple(categories),
+            tuple(npa_classification[c]['count'] for c in categories),
+            tuple(npa_classification[c]['percentage'] for c in categories)
         )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(go.Figure(fig), use_container_width=True)
 
     with npa_col2:
         st.subheader("NPA Summary")
@@ -247,26 +332,13 @@ if repayment_data:
     with rep_col1:
         st.subheader("Payment Status Distribution")
 
-        statuses = ['On-Time', 'Overdue', 'Partial', 'Pending']
-        status_counts = [
+        fig = build_payment_status_pie(
             rep_summary.get('on_time_payments', 0),
             rep_summary.get('overdue_payments', 0),
             rep_summary.get('partial_payments', 0),
             rep_summary.get('pending_payments', 0)
-        ]
-        status_colors = ['#66bb6a', '#ef5350', '#ffa726', '#bdbdbd']
-
-        fig = go.Figure(data=[go.Pie(
-            labels=statuses, values=status_counts,
-            hole=0.4,
-            marker_colors=status_colors,
-            textinfo='label+percent'
-        )])
-        fig.update_layout(
-            height=350, margin=dict(t=30, b=10, l=10, r=10),
-            template='plotly_white'
         )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(go.Figure(fig), use_container_width=True)
 
     with rep_col2:
         st.subheader("Collection Metrics")
@@ -284,4 +356,5 @@ if repayment_data:
 st.divider()
 
 # ─── Footer ──────────────────────────────────────────────────────
-st.caption("Dashboard auto-refreshes when data changes. Click 'Rerun' to refresh manually.")
+st.caption("KPIs are re-fetched every 30 seconds (the API may serve figures up to a minute old; "
+           "see 'Figures as of'); charts reload on interaction or via '🔄 Refresh' in the sidebar.")
@@ -0,0 +1,30 @@
+"""
+Gunicorn configuration for serving the Credit Risk Assessment API.
+
+Usage (from the project root):
+    gunicorn 'backend.app:create_app()'
+"""
+
+import multiprocessing
+
+# `config` is itself a gunicorn setting name, so import values explicitly
+from config import (
+    API_HOST, API_PORT, WSGI_WORKERS, WSGI_THREADS,
+    POOL_SIZE, MAX_OVERFLOW, DB_MAX_CONNECTIONS
+)
+
+bind = f'{API_HOST}:{API_PORT}'
+
+# CPU parallelism across processes, I/O concurrency (DB waits) via threads.
+# Each worker owns its own SQLAlchemy pool (sized from WSGI_THREADS), so the
+# default worker count is capped to keep every pool within DB_MAX_CONNECTIONS.
+workers = WSGI_WORKERS or min(
+    2 * multiprocessing.cpu_count() + 1,
+    max(DB_MAX_CONNECTIONS // (POOL_SIZE + MAX_OVERFLOW), 1)
+)
+worker_class = 'gthread'
+threads = WSGI_THREADS
+
+timeout = 30
+keepalive = 5               # Reuse client connections (e.g. the dashboard's polling)
+accesslog = '-'
@@ -15,12 +15,21 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import config
+from backend.utils.calculations import calculate_age_vec, calculate_emi_vec
+
+# Rows per server-side cursor round trip when fetching training data
+FETCH_BATCH_SIZE = 10000
 
 
 def fetch_training_data():
     """
     Fetch raw data from PostgreSQL for model training.
-    Joins customers, employment, applications, and loans tables.
+    Joins customers, employment, applications, and loans tables,
+    selecting only the columns engineer_features() reads.
+
+    Rows are streamed through a server-side cursor and converted to a
+    DataFrame one batch at a time, so only FETCH_BATCH_SIZE rows are ever
+    held as Python tuples.
     """
     import psycopg2
 
@@ -35,21 +44,15 @@ def fetch_training_data():
     query = """
         SELECT
             la.application_id,
-            la.customer_id,
             la.loan_amount,
             la.loan_tenure_months,
             la.interest_rate,
             la.loan_purpose,
-            la.status,
             la.risk_probability,
             c.date_of_birth,
-            c.gender,
-            c.city,
-            c.state,
             e.employment_type,
             e.monthly_income,
-            e.years_of_experience,
-            e.employer_name
+            e.years_of_experience
         FROM loan_applications la
         JOIN customers c ON la.customer_id = c.customer_id
         LEFT JOIN employment_details e ON la.customer_id = e.customer_id
@@ -58,17 +61,32 @@ def fetch_training_data():
         AND e.monthly_income > 0
     """
 
-    df = pd.read_sql(query, conn)
-    conn.close()
+    chunks = []
+    try:
+        with conn.cursor(name='training_data') as cur:
+            cur.itersize = FETCH_BATCH_SIZE
+            cur.execute(query)
+            while rows := cur.fetchmany(FETCH_BATCH_SIZE):
+                columns = [col.name for col in cur.description]
+                chunk = pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+                # A column that is all NULL within a batch comes back as object
+                # dtype; make it float NaN so it doesn't decide the merged dtype
+                chunks.append(chunk.astype({c: 'float64' for c in chunk.columns[chunk.isna().all()]}))
+    finally:
+        conn.close()
+
+    df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
 
     print(f"📊 Fetched {len(df)} records from database")
     return df
 
 
-def engineer_features(df):
+def engineer_features(df, today=None):
     """
     Transform raw data into 28 ML-ready features.
 
+    `today` (date) is the reference date for ages; defaults to the current date.
+
     Feature categories:
     1. Financial ratios (DTI, LTI, EMI-to-income)
     2. Customer demographics (age, income, experience)
@@ -86,29 +104,25 @@ def engineer_features(df):
     df['years_of_experience'] = df['years_of_experience'].astype(float).fillna(0)
 
     # ─── 2. Age Calculation ─────────────────────────────────────
+    # Same formula as calculate_age() at serving time (fractional years)
     df['date_of_birth'] = pd.to_datetime(df['date_of_birth'])
-    df['age'] = (pd.Timestamp.now() - df['date_of_birth']).dt.days / 365.25
-    df['age'] = df['age'].round(1)
+    df['age'] = calculate_age_vec(
+        df['date_of_birth'].to_numpy(dtype='datetime64[D]'),
+        today or datetime.now().date()
+    )
 
     # ─── 3. Annual Income ──────────────────────────────────────
     df['annual_income'] = df['monthly_income'] * 12
 
     # ─── 4. EMI Calculation ─────────────────────────────────────
-    def calc_emi(row):
-        p = row['loan_amount']
-        r = row['interest_rate'] / (12 * 100)
-        n = row['loan_tenure_months']
-        if r == 0:
-            return p / n
-        emi = p * r * (1 + r) ** n / ((1 + r) ** n - 1)
-        return round(emi, 2)
-
-    df['estimated_emi'] = df.apply(calc_emi, axis=1)
+    df['estimated_emi'] = calculate_emi_vec(
+        df['loan_amount'], df['interest_rate'], df['loan_tenure_months']
+    )
 
     # ─── 5. Financial Ratios (core risk features) ───────────────
     df['debt_to_income_ratio'] = df['estimated_emi'] / df['monthly_income']
     df['loan_to_income_ratio'] = df['loan_amount'] / df['annual_income']
-    df['emi_to_income_ratio'] = df['estimated_emi'] / df['monthly_income']
+    df['emi_to_income_ratio'] = df['debt_to_income_ratio']  # Same ratio; EMI is the only debt modelled
     df['loan_per_month'] = df['loan_amount'] / df['loan_tenure_months']
 
     # ─── 6. Interest Burden ─────────────────────────────────────
@@ -125,11 +139,16 @@ def engineer_features(df):
     df['log_loan_amount'] = np.log1p(df['loan_amount'])
 
     # ─── 8. Risk Flags (binary indicators) ──────────────────────
-    df['high_dti_flag'] = (df['debt_to_income_ratio'] > 0.40).astype(int)
-    df['high_lti_flag'] = (df['loan_to_income_ratio'] > 5).astype(int)
-    df['high_interest_flag'] = (df['interest_rate'] > 12).astype(int)
-    df['young_borrower_flag'] = (df['age'] < 25).astype(int)
-    df['low_experience_flag'] = (df['years_of_experience'] < 2).astype(int)
+    # Compared on the raw arrays and written as one uint8 block
+    flags = np.column_stack([
+        df['debt_to_income_ratio'].to_numpy() > 0.40,
+        df['loan_to_income_ratio'].to_numpy() > 5,
+        df['interest_rate'].to_numpy() > 12,
+        df['age'].to_numpy() < 25,
+        df['years_of_experience'].to_numpy() < 2,
+    ]).view(np.uint8)
+    df[['high_dti_flag', 'high_lti_flag', 'high_interest_flag',
+        'young_borrower_flag', 'low_experience_flag']] = flags
 
     # ─── 9. Target Variable ────────────────────────────────────
     # High risk = 1 (rejected or high risk probability)
@@ -139,19 +158,26 @@ def engineer_features(df):
     )
 
     # ─── 10. One-Hot Encoding ──────────────────────────────────
-    # Loan purpose
-    purpose_dummies = pd.get_dummies(df['loan_purpose'], prefix='purpose', dtype=int)
-    # Keep top 5 purposes, combine rest into 'other'
-    top_purposes = purpose_dummies.sum().nlargest(5).index
-    for col in purpose_dummies.columns:
-        if col not in top_purposes:
-            purpose_dummies.drop(col, axis=1, inplace=True)
-
-    # Employment type
-    emp_dummies = pd.get_dummies(df['employment_type'], prefix='emp_type', dtype=int)
-
-    # Combine
-    df = pd.concat([df, purpose_dummies, emp_dummies], axis=1)
+    # Loan purpose: keep the top 5 purposes (ties → alphabetical), the rest
+    # and missing values fall into an implicit all-zero 'other'. Rows are
+    # integer-coded and indexed into an identity matrix, so only the kept
+    # columns are ever allocated (uint8: an eighth of int64 dummies).
+    # Each block is appended in place as one uint8 block, no frame concat.
+    codes, purposes = pd.factorize(df['loan_purpose'], sort=True)
+    counts = np.bincount(codes[codes >= 0], minlength=len(purposes))
+    top = np.sort(np.argsort(-counts, kind='stable')[:5])
+    slot = np.full(len(purposes) + 1, len(top))     # Last entry catches code -1 (missing)
+    slot[top] = np.arange(len(top))
+    if len(top):
+        df[[f'purpose_{p}' for p in purposes[top]]] = \
+            np.eye(len(top) + 1, dtype=np.uint8)[slot[codes], :len(top)]
+
+    # Employment type: every category kept; code -1 (missing) picks the
+    # identity matrix's extra row, which is zero in all kept columns
+    codes, emp_types = pd.factorize(df['employment_type'], sort=True)
+    if len(emp_types):
+        df[[f'emp_type_{e}' for e in emp_types]] = \
+            np.eye(len(emp_types) + 1, dtype=np.uint8)[codes, :len(emp_types)]
 
     print(f"   ✓ Created {len(get_feature_columns(df))} features")
     return df
@@ -180,12 +206,15 @@ def get_feature_columns(df):
 def prepare_training_data():
     """
     Full pipeline: fetch data → engineer features → return X, y, feature_columns.
+
+    X is a C-contiguous float32 ndarray (missing values → 0), the dtype the
+    tree ensembles split on, so fit() takes it without another copy.
     """
     df = fetch_training_data()
     df = engineer_features(df)
 
     feature_cols = get_feature_columns(df)
-    X = df[feature_cols].fillna(0)
+    X = np.ascontiguousarray(df[feature_cols].to_numpy(dtype=np.float32, na_value=0))
     y = df['is_high_risk']
 
     print(f"\n📋 Training Data Summary:")
@@ -1,83 +1,124 @@
 """
 Real-time Credit Risk Prediction with SHAP Explainability.
 
-Loads the trained Random Forest model, generates risk predictions,
+Loads the trained tree ensemble (Random Forest by default), generates risk predictions,
 and provides SHAP-based feature contribution explanations.
 """
 
-import sys
 import os
-
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import functools
+import threading
+from collections import OrderedDict
 
 import numpy as np
 import pandas as pd
 import joblib
 import config
 
-# Global model cache (loaded once, reused for all predictions)
-_model = None
-_feature_columns = None
-_shap_explainer = None
+# ml_model_version recorded for each trained model class
+_MODEL_VERSIONS = {
+    'RandomForestClassifier': 'RF_v1.0',
+    'HistGradientBoostingClassifier': 'HGB_v1.0',
+}
 
+# (risk_probability, top contributors) per exact float32 feature row (LRU);
+# repeat submissions of the same application skip both the forest and SHAP.
+# Entries belong to _prediction_cache_model and are dropped if it changes.
+_PREDICTION_CACHE_SIZE = 4096
+_prediction_cache = OrderedDict()
+_prediction_cache_lock = threading.Lock()
+_prediction_cache_model = None
 
-def _load_model():
-    """Load model artifacts from disk (cached after first load)."""
-    global _model, _feature_columns
 
-    if _model is None:
-        if not os.path.exists(config.MODEL_PATH):
-            raise FileNotFoundError(
-                f"Model not found at {config.MODEL_PATH}. Run 'python ml/train_model.py' first."
-            )
+@functools.lru_cache(maxsize=1)
+def _load_model():
+    """Load model artifacts from disk (cached after first successful load)."""
+    if not os.path.exists(config.MODEL_PATH):
+        raise FileNotFoundError(
+            f"Model not found at {config.MODEL_PATH}. Run 'python ml/train_model.py' first."
+        )
+
+    # Uncompressed arrays are memory-mapped read-only. A hist_gradient_boosting
+    # model keeps its predictor node arrays mapped, so workers share them
+    # through the OS page cache. RandomForest trees copy their node/value
+    # arrays into private buffers on unpickle (Tree.__setstate__), so there
+    # each worker still holds its own copy and the mapping only keeps the
+    # on-disk arrays out of the load-time heap.
+    model = joblib.load(config.MODEL_PATH, mmap_mode='r')
+    feature_columns = joblib.load(config.FEATURE_COLUMNS_PATH)
+    print(f"📊 Model loaded: {len(feature_columns)} features")
+
+    return model, feature_columns
+
+
+@functools.lru_cache(maxsize=1)
+def _get_shap_explainer():
+    """Create or return cached SHAP explainer."""
+    try:
+        import shap
+    except ImportError:
+        print("⚠️ SHAP not installed. Feature contributions unavailable.")
+        return None
 
-        _model = joblib.load(config.MODEL_PATH)
-        _feature_columns = joblib.load(config.FEATURE_COLUMNS_PATH)
-        print(f"📊 Model loaded: {len(_feature_columns)} features")
+    model, _ = _load_model()
+    # Closed-form path-dependent TreeSHAP: no background dataset needed
+    return shap.TreeExplainer(model, feature_perturbation='tree_path_dependent')
 
-    return _model, _feature_columns
 
+@functools.lru_cache(maxsize=4)
+def _column_layout(feature_columns):
+    """
+    Index map for a tuple of training feature columns (parsed once per model).
 
-def _get_shap_explainer():
-    """Create or return cached SHAP explainer."""
-    global _shap_explainer
+    Returns (numeric_slots, purpose_idx, emp_type_idx): numeric_slots is a
+    list of (column_index, feature_name) for non one-hot columns, and the
+    two dicts map a category value to its one-hot column index.
+    """
+    numeric_slots = []
+    purpose_idx = {}
+    emp_type_idx = {}
+    for j, col in enumerate(feature_columns):
+        if col.startswith('purpose_'):
+            purpose_idx[col.removeprefix('purpose_')] = j
+        elif col.startswith('emp_type_'):
+            emp_type_idx[col.removeprefix('emp_type_')] = j
+        else:
+            numeric_slots.append((j, col))
+    return numeric_slots, purpose_idx, emp_type_idx
 
-    if _shap_explainer is None:
-        try:
-            import shap
-            model, _ = _load_model()
-            _shap_explainer = shap.TreeExplainer(model)
-        except ImportError:
-            print("⚠️ SHAP not installed. Feature contributions unavailable.")
-            return None
 
-    return _shap_explainer
+def _safe_ratio(numerator, denominator, default):
+    """Element-wise numerator / denominator, `default` where denominator <= 0."""
+    out = np.full(len(numerator), default, dtype=np.float64)   # default may be an array
+    return np.divide(numerator, denominator, out=out, where=denominator > 0)
 
 
-def _build_feature_vector(features, feature_columns):
-    """
-    Build a feature vector matching the training feature columns.
-    Handles missing or new features gracefully.
+def _build_feature_matrix(features_list, feature_columns):
     """
-    # Calculate derived features if not present
-    monthly_income = features.get('monthly_income', 50000)
-    annual_income = features.get('annual_income', monthly_income * 12)
-    loan_amount = features.get('loan_amount', 500000)
-    tenure = features.get('loan_tenure_months', 36)
-    interest_rate = features.get('interest_rate', 10)
-    emi = features.get('estimated_emi', 0)
-    experience = features.get('years_of_experience', 5)
-    age = features.get('age', 35)
-
-    # EMI calculation if not provided
-    if emi == 0:
-        r = interest_rate / (12 * 100)
-        if r > 0:
-            emi = loan_amount * r * (1 + r) ** tenure / ((1 + r) ** tenure - 1)
-        else:
-            emi = loan_amount / tenure
+    Build a (len(features_list), len(feature_columns)) feature matrix
+    matching the training feature columns, one row per LoanFeatures.
 
-    # Build full feature dictionary
+    Derived features are computed column-wise across the whole batch.
+    Categories unseen at training time leave their one-hot block all zero.
+    """
+    def column(attr):
+        return np.fromiter((getattr(f, attr) for f in features_list),
+                           dtype=np.float64, count=len(features_list))
+
+    monthly_income = column('monthly_income')
+    annual_income = column('annual_income')
+    loan_amount = column('loan_amount')
+    tenure = column('loan_tenure_months')
+    interest_rate = column('interest_rate')
+    emi = column('estimated_emi')
+    experience = column('years_of_experience')
+    age = column('age')
+
+    dti = _safe_ratio(emi, monthly_income, 1)
+    lti = _safe_ratio(loan_amount, annual_income, 10)
+    total_interest = emi * tenure - loan_amount
+
+    # Build full feature dictionary (one array per column)
     full_features = {
         'loan_amount': loan_amount,
         'loan_tenure_months': tenure,
@@ -87,131 +128,214 @@ def _build_feature_vector(features, feature_columns):
         'years_of_experience': experience,
         'age': age,
         'estimated_emi': emi,
-        'debt_to_income_ratio': emi / monthly_income if monthly_income > 0 else 1,
-        'loan_to_income_ratio': loan_amount / annual_income if annual_income > 0 else 10,
-        'emi_to_income_ratio': emi / monthly_income if monthly_income > 0 else 1,
+        'debt_to_income_ratio': dti,
+        'loan_to_income_ratio': lti,
+        'emi_to_income_ratio': dti,
         'loan_per_month': loan_amount / tenure,
-        'total_interest': emi * tenure - loan_amount,
-        'interest_to_principal': (emi * tenure - loan_amount) / loan_amount if loan_amount > 0 else 0,
-        'income_per_year_exp': monthly_income / experience if experience > 0 else monthly_income,
+        'total_interest': total_interest,
+        'interest_to_principal': _safe_ratio(total_interest, loan_amount, 0),
+        'income_per_year_exp': _safe_ratio(monthly_income, experience, monthly_income),
         'log_income': np.log1p(monthly_income),
         'log_loan_amount': np.log1p(loan_amount),
-        'high_dti_flag': 1 if (emi / monthly_income if monthly_income > 0 else 1) > 0.40 else 0,
-        'high_lti_flag': 1 if (loan_amount / annual_income if annual_income > 0 else 10) > 5 else 0,
-        'high_interest_flag': 1 if interest_rate > 12 else 0,
-        'young_borrower_flag': 1 if age < 25 else 0,
-        'low_experience_flag': 1 if experience < 2 else 0,
+        'high_dti_flag': dti > 0.40,
+        'high_lti_flag': lti > 5,
+        'high_interest_flag': interest_rate > 12,
+        'young_borrower_flag': age < 25,
+        'low_experience_flag': experience < 2,
     }
 
-    # Handle one-hot encoded features
-    loan_purpose = features.get('loan_purpose', '')
-    employment_type = features.get('employment_type', '')
-    for col in feature_columns:
-        if col.startswith('purpose_') and col == f'purpose_{loan_purpose}':
-            full_features[col] = 1
-        elif col.startswith('purpose_'):
-            full_features[col] = full_features.get(col, 0)
-        elif col.startswith('emp_type_') and col == f'emp_type_{employment_type}':
-            full_features[col] = 1
-        elif col.startswith('emp_type_'):
-            full_features[col] = full_features.get(col, 0)
+    numeric_slots, purpose_idx, emp_type_idx = _column_layout(tuple(feature_columns))
 
-    # Build vector in correct column order
-    vector = []
-    for col in feature_columns:
-        vector.append(full_features.get(col, 0))
+    # Build matrix in correct column order; float32 is the dtype sklearn's
+    # tree ensembles traverse with, so predict_proba uses it without a copy
+    X = np.zeros((len(features_list), len(feature_columns)), dtype=np.float32)
+    for j, name in numeric_slots:
+        if name in full_features:
+            X[:, j] = full_features[name]
 
-    return np.array(vector).reshape(1, -1)
+    # Handle one-hot encoded features: one dict lookup per row and category
+    for i, f in enumerate(features_list):
+        j = purpose_idx.get(f.loan_purpose)
+        if j is not None:
+            X[i, j] = 1
+        j = emp_type_idx.get(f.employment_type)
+        if j is not None:
+            X[i, j] = 1
 
+    return X
 
-def predict_risk(features):
+
+def _build_feature_vector(features, feature_columns):
     """
-    Generate credit risk prediction with SHAP explanations.
+    Build a feature vector matching the training feature columns.
+    Handles new (one-hot) feature columns gracefully.
+    """
+    return _build_feature_matrix([features], feature_columns)
 
-    Args:
-        features (dict): Customer and loan features
 
-    Returns:
-        dict: {
-            'risk_probability': float (0-1),
-            'credit_score': float (300-850),
-            'contributors': list of {feature, impact},
-            'model_used': str
-        }
-    """
-    model, feature_columns = _load_model()
+def _top_contributors(contributions, feature_columns):
+    """Top 5 features by absolute SHAP impact."""
+    feature_impacts = sorted(
+        zip(feature_columns, contributions),
+        key=lambda x: abs(x[1]),
+        reverse=True
+    )
+    return [
+        {'feature': feat, 'impact': round(float(impact), 4)}
+        for feat, impact in feature_impacts[:5]
+    ]
 
-    # Build feature vector
-    X = _build_feature_vector(features, feature_columns)
 
-    # Model prediction
-    risk_probability = float(model.predict_proba(X)[0][1])
+def _score_rows(model, feature_columns, X):
+    """
+    Score every row of X: one predict_proba call and one SHAP pass.
 
-    # Credit score (inverse mapping)
-    from backend.utils.calculations import risk_probability_to_credit_score
-    credit_score = risk_probability_to_credit_score(risk_probability)
+    Returns (rows, explained): rows is a list of (risk_probability,
+    contributors) with contributors as (feature, impact) tuples, and
+    explained is False when SHAP failed and the importance fallback was used.
+    """
+    risk_probabilities = model.predict_proba(X)[:, 1].tolist()
 
     # SHAP explanations
-    contributors = []
+    contributors = [() for _ in risk_probabilities]
     explainer = _get_shap_explainer()
+    explained = True
     if explainer is not None:
         try:
             shap_values = explainer.shap_values(X)
             # For binary classification, use class 1 (high risk) SHAP values
             if isinstance(shap_values, list):
-                contributions = shap_values[1][0]
-            else:
-                contributions = shap_values[0]
-
-            # Sort by absolute impact
-            feature_impacts = sorted(
-                zip(feature_columns, contributions),
-                key=lambda x: abs(x[1]),
-                reverse=True
-            )
-
-            # Return top 5 contributors
-            for feat, impact in feature_impacts[:5]:
-                contributors.append({
-                    'feature': feat,
-                    'impact': round(float(impact), 4)
-                })
+                shap_values = shap_values[1]
+
+            # Top 5 contributors per row, sorted by absolute impact
+            contributors = [
+                tuple((c['feature'], c['impact']) for c in _top_contributors(row, feature_columns))
+                for row in shap_values
+            ]
         except Exception as e:
             print(f"⚠️ SHAP explanation failed: {e}")
-            # Fallback: use feature importance
-            importances = model.feature_importances_
+            explained = False
+            # Fallback: use feature importance (Random Forest only)
             top_features = sorted(
-                zip(feature_columns, importances),
+                zip(feature_columns, getattr(model, 'feature_importances_', ())),
                 key=lambda x: x[1],
                 reverse=True
             )[:5]
-            for feat, imp in top_features:
-                contributors.append({
-                    'feature': feat,
-                    'impact': round(float(imp) * (1 if risk_probability > 0.5 else -1), 4)
-                })
-
-    return {
-        'risk_probability': risk_probability,
-        'credit_score': credit_score,
-        'contributors': contributors,
-        'model_used': 'RF_v1.0'
-    }
+            contributors = [
+                tuple(
+                    (feat, round(float(imp) * (1 if p > 0.5 else -1), 4))
+                    for feat, imp in top_features
+                )
+                for p in risk_probabilities
+            ]
+
+    return list(zip(risk_probabilities, contributors)), explained
+
+
+def predict_risk_batch(features_list):
+    """
+    Generate credit risk predictions for many applications at once.
+
+    All rows share one feature-matrix build; rows not in the prediction
+    cache share one predict_proba call and one SHAP pass.
+
+    Args:
+        features_list (list[LoanFeatures]): Customer and loan features
+
+    Returns:
+        list[dict]: one predict_risk() result per input, in order
+    """
+    global _prediction_cache_model
+    model, feature_columns = _load_model()
+
+    # Build feature matrix
+    X = _build_feature_matrix(features_list, feature_columns)
+
+    keys = [row.tobytes() for row in X]
+    scored = {}
+    with _prediction_cache_lock:
+        if _prediction_cache_model is not model:
+            _prediction_cache.clear()
+            _prediction_cache_model = model
+        for key in keys:
+            if key in _prediction_cache:
+                _prediction_cache.move_to_end(key)
+                scored[key] = _prediction_cache[key]
+
+    # Score each distinct uncached row once
+    missing = {}
+    for i, key in enumerate(keys):
+        if key not in scored and key not in missing:
+            missing[key] = i
+    if missing:
+        rows, explained = _score_rows(model, feature_columns, X[list(missing.values())])
+        fresh = dict(zip(missing, rows))
+        scored.update(fresh)
+        # Importance-fallback results are not cached, so a transient SHAP
+        # failure doesn't outlive the request
+        if explained:
+            with _prediction_cache_lock:
+                if _prediction_cache_model is model:
+                    _prediction_cache.update(fresh)
+                    while len(_prediction_cache) > _PREDICTION_CACHE_SIZE:
+                        _prediction_cache.popitem(last=False)
+
+    # Credit score (inverse mapping)
+    from backend.utils.calculations import risk_probability_to_credit_score
+
+    model_used = _MODEL_VERSIONS.get(type(model).__name__, 'RF_v1.0')
+    results = []
+    for key in keys:
+        p, contributors = scored[key]
+        results.append({
+            'risk_probability': p,
+            'credit_score': risk_probability_to_credit_score(p),
+            'contributors': [{'feature': feat, 'impact': impact} for feat, impact in contributors],
+            'model_used': model_used
+        })
+    return results
+
+
+def predict_risk(features):
+    """
+    Generate credit risk prediction with SHAP explanations.
+
+    Args:
+        features (LoanFeatures): Customer and loan features
+
+    Returns:
+        dict: {
+            'risk_probability': float (0-1),
+            'credit_score': float (300-850),
+            'contributors': list of {feature, impact},
+            'model_used': str
+        }
+    """
+    return predict_risk_batch([features])[0]
 
 
 if __name__ == '__main__':
     # Test prediction with sample data
-    sample = {
-        'loan_amount': 3500000,
-        'loan_tenure_months': 36,
-        'interest_rate': 9.5,
-        'monthly_income': 75000,
-        'years_of_experience': 8,
-        'age': 35,
-        'loan_purpose': 'Home Renovation',
-        'employment_type': 'Salaried',
-        'city': 'Bangalore'
-    }
+    from backend.schemas import LoanFeatures
+    from backend.utils.calculations import calculate_emi
+
+    emi = calculate_emi(3500000, 9.5, 36)
+    sample = LoanFeatures(
+        loan_amount=3500000,
+        loan_tenure_months=36,
+        interest_rate=9.5,
+        monthly_income=75000,
+        annual_income=75000 * 12,
+        years_of_experience=8,
+        age=35,
+        estimated_emi=emi,
+        debt_to_income_ratio=emi / 75000,
+        loan_to_income_ratio=3500000 / (75000 * 12),
+        emi_to_income_ratio=emi / 75000,
+        loan_purpose='Home Renovation',
+        employment_type='Salaried',
+        city='Bangalore'
+    )
 
     print("🔮 Testing prediction with sample data...")
     result = predict_risk(sample)
@@ -1,7 +1,8 @@
 """
-Random Forest Model Training Pipeline.
+Credit Risk Model Training Pipeline.
 
-Trains a credit risk classifier on engineered features:
+Trains a credit risk classifier (Random Forest by default, see
+config.MODEL_ALGORITHM) on engineered features:
 - 80/20 train-test split
 - 5-fold cross-validation
 - Feature importance analysis
@@ -17,18 +18,42 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 import numpy as np
 import pandas as pd
 import joblib
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.metrics import (
-    accuracy_score, precision_score, recall_score, f1_score,
-    roc_auc_score, confusion_matrix, classification_report
-)
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
+from sklearn.inspection import permutation_importance
+from sklearn.model_selection import train_test_split, cross_validate
+from sklearn.metrics import accuracy_score, roc_auc_score, confusion_matrix
 import config
 from ml.data_prep import prepare_training_data
 
 
+def build_model(algorithm=None):
+    """Unfitted classifier for config.MODEL_ALGORITHM (or `algorithm`)."""
+    algorithm = algorithm or config.MODEL_ALGORITHM
+    if algorithm == 'random_forest':
+        return RandomForestClassifier(
+            n_estimators=100,
+            max_depth=10,
+            class_weight='balanced',
+            random_state=42,
+            n_jobs=-1,
+            min_samples_split=5,
+            min_samples_leaf=2
+        )
+    if algorithm == 'hist_gradient_boosting':
+        return HistGradientBoostingClassifier(
+            max_iter=200,
+            max_depth=8,
+            learning_rate=0.05,
+            class_weight='balanced',
+            early_stopping=True,
+            random_state=42
+        )
+    raise ValueError(f"Unknown MODEL_ALGORITHM: {algorithm!r}")
+
+
 def train_model():
-    """Train Random Forest classifier and evaluate performance."""
+    """Train the configured classifier and evaluate performance."""
     print("=" * 60)
     print("🧠 CREDIT RISK MODEL TRAINING PIPELINE")
     print("=" * 60)
@@ -45,32 +70,27 @@ def train_model():
     print(f"   Training set: {len(X_train)} samples")
     print(f"   Test set:     {len(X_test)} samples")
 
-    # ─── Step 3: Train Random Forest ────────────────────────────
-    print("\n🌲 Step 3: Training Random Forest classifier...")
+    # ─── Step 3: Train classifier ───────────────────────────────
+    model = build_model()
+    print(f"\n🌲 Step 3: Training {type(model).__name__}...")
     start_time = time.time()
 
-    model = RandomForestClassifier(
-        n_estimators=100,
-        max_depth=10,
-        class_weight='balanced',
-        random_state=42,
-        n_jobs=-1,
-        min_samples_split=5,
-        min_samples_leaf=2
-    )
     model.fit(X_train, y_train)
     train_time = time.time() - start_time
     print(f"   Training time: {train_time:.2f}s")
 
     # ─── Step 4: Evaluate on test set ───────────────────────────
     print("\n📈 Step 4: Evaluating model performance...")
-    y_pred = model.predict(X_test)
     y_prob = model.predict_proba(X_test)[:, 1]
-
-    accuracy = accuracy_score(y_test, y_pred)
-    precision = precision_score(y_test, y_pred)
-    recall = recall_score(y_test, y_pred)
-    f1 = f1_score(y_test, y_pred)
+    y_pred = (y_prob > 0.5).astype(int)    # Same labels as predict(), one forest pass
+
+    # Threshold metrics derived from the 2×2 confusion matrix (zero when undefined)
+    cm = confusion_matrix(y_test, y_pred, labels=[0, 1])
+    tn, fp, fn, tp = cm.ravel()
+    accuracy = (tp + tn) / cm.sum()
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
     roc_auc = roc_auc_score(y_test, y_prob)
 
     print(f"\n   Test Results:")
@@ -82,7 +102,6 @@ def train_model():
     print(f"   ROC-AUC:   {roc_auc:.2%}")
 
     # Confusion matrix
-    cm = confusion_matrix(y_test, y_pred)
     print(f"\n   Confusion Matrix:")
     print(f"   ─────────────────────────────────")
     print(f"                  Predicted")
@@ -92,8 +111,14 @@ def train_model():
 
     # ─── Step 5: Cross-validation ───────────────────────────────
     print("\n🔄 Step 5: 5-fold cross-validation...")
-    cv_accuracy = cross_val_score(model, X, y, cv=5, scoring='accuracy')
-    cv_roc_auc = cross_val_score(model, X, y, cv=5, scoring='roc_auc')
+    # Both scorers share one set of fold fits; folds run in parallel, each
+    # fitting single-threaded so workers don't oversubscribe the cores
+    cv_model = clone(model)
+    if 'n_jobs' in cv_model.get_params():
+        cv_model.set_params(n_jobs=1)
+    cv_scores = cross_validate(cv_model, X, y, cv=5, scoring=('accuracy', 'roc_auc'), n_jobs=-1)
+    cv_accuracy = cv_scores['test_accuracy']
+    cv_roc_auc = cv_scores['test_roc_auc']
 
     print(f"   Mean Accuracy: {cv_accuracy.mean():.2%} ± {cv_accuracy.std():.2%}")
     print(f"   Mean ROC-AUC:  {cv_roc_auc.mean():.2%} ± {cv_roc_auc.std():.2%}")
@@ -106,7 +131,13 @@ def train_model():
 
     # ─── Step 6: Feature importance ─────────────────────────────
     print("\n🏆 Step 6: Top 10 most important features:")
-    importances = model.feature_importances_
+    if hasattr(model, 'feature_importances_'):
+        importances = model.feature_importances_
+    else:
+        # Boosted models expose no impurity importances; use held-out permutation
+        importances = permutation_importance(
+            model, X_test, y_test, scoring='roc_auc', n_repeats=5, random_state=42, n_jobs=-1
+        ).importances_mean
     feature_imp = sorted(
         zip(feature_columns, importances),
         key=lambda x: x[1],
@@ -121,7 +152,8 @@ def train_model():
     print("\n💾 Step 7: Saving model artifacts...")
     os.makedirs(config.MODEL_DIR, exist_ok=True)
 
-    joblib.dump(model, config.MODEL_PATH)
+    # Uncompressed so ml.predict can memory-map the arrays on load
+    joblib.dump(model, config.MODEL_PATH, compress=0)
     joblib.dump(feature_columns, config.FEATURE_COLUMNS_PATH)
 
     model_size = os.path.getsize(config.MODEL_PATH) / 1024
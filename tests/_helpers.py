@@ -0,0 +1,20 @@
+"""
+Assertion helpers shared by the route tests.
+"""
+
+
+def assert_json(response, allowed, required_keys=()):
+    """
+    Assert the response status is in `allowed`; for a 2xx response also
+    assert each of `required_keys` is in the JSON body.
+
+    Returns the decoded body for a 2xx response, None otherwise (the body
+    of an error response is never read).
+    """
+    assert response.status_code in allowed
+    if response.status_code >= 300:
+        return None
+    data = response.get_json()
+    for key in required_keys:
+        assert key in data
+    return data
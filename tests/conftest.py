@@ -0,0 +1,76 @@
+"""
+Shared pytest fixtures.
+
+The Flask app is built once per test session; the route tests only issue
+HTTP requests against it and never reconfigure it.
+"""
+
+import pytest
+
+# Plain assert statements in the helper module get pytest's detailed failure reports
+pytest.register_assert_rewrite('tests._helpers')
+
+
+def pytest_addoption(parser):
+    parser.addoption('--run-ml', action='store_true',
+                     help='run tests marked ml (model load + prediction)')
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip `ml` tests unless --run-ml is given or -m selects on ml."""
+    if config.getoption('--run-ml') or 'ml' in config.getoption('markexpr'):
+        return
+    skip_ml = pytest.mark.skip(reason='ML prediction test; use --run-ml or -m ml')
+    for item in items:
+        if item.get_closest_marker('ml'):
+            item.add_marker(skip_ml)
+
+
+@pytest.fixture(scope='session')
+def app():
+    """Flask application shared by every route test."""
+    from backend.app import create_app
+
+    app = create_app()
+    app.config['TESTING'] = True
+    return app
+
+
+@pytest.fixture(scope='session')
+def client(app):
+    """Test client for the shared Flask application."""
+    with app.test_client() as client:
+        yield client
+
+
+@pytest.fixture(scope='session')
+def has_db(client):
+    """Whether the API can reach its database (probed once per session)."""
+    return client.get('/readiness').status_code == 200
+
+
+@pytest.fixture
+def requires_db(has_db):
+    """
+    Skip the requesting test when the database is unavailable.
+
+    Tests using this fixture expect the seeded database
+    (database/seed_data.py), so customer 1 exists; a 500 always fails them.
+    """
+    if not has_db:
+        pytest.skip('database unavailable')
+
+
+@pytest.fixture(scope='session')
+def warm_model():
+    """
+    Load the ML model and SHAP explainer once, so their cold-start cost is
+    reported as fixture setup rather than inside the first prediction test.
+    The route falls back to rule-based scoring if either is unavailable.
+    """
+    try:
+        from ml.predict import _load_model, _get_shap_explainer
+        _load_model()
+        _get_shap_explainer()
+    except Exception:
+        pass
@@ -5,15 +5,13 @@ Tests EMI, DTI, LTI, NPA classification, credit score mapping,
 and risk recommendation generation.
 """
 
-import sys
-import os
 import pytest
-
-# Add project root to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import pandas as pd
+from datetime import date, timedelta
 
 from backend.utils.calculations import (
     calculate_emi,
+    calculate_age,
     calculate_dti_ratio,
     calculate_lti_ratio,
     calculate_ltv_ratio,
@@ -21,8 +19,13 @@ from backend.utils.calculations import (
     calculate_provision,
     risk_probability_to_credit_score,
     get_risk_level,
-    generate_recommendation
+    get_approval_status,
+    generate_recommendation,
+    calculate_emi_vec,
+    classify_npa_vec,
+    calculate_provision_vec
 )
+from ml.data_prep import engineer_features
 
 
 class TestEMICalculation:
@@ -196,6 +199,38 @@ class TestCreditScoreMapping:
         assert score == 300.0
 
 
+class TestAge:
+    """Tests for age in fractional years (days / 365.25, 1 decimal)."""
+
+    def test_fractional_years(self):
+        assert calculate_age(date(1988, 4, 1), date(2024, 1, 1)) == 35.8
+
+    def test_day_before_birthday(self):
+        assert calculate_age(date(1990, 5, 15), date(2024, 5, 14)) == 34.0
+
+    def test_on_birthday(self):
+        assert calculate_age(date(1990, 5, 15), date(2024, 5, 15)) == 34.0
+
+    def test_matches_training_feature(self):
+        """Serving age must equal the `age` column the model was trained on."""
+        today = date(2024, 6, 1)
+        dobs = [date(1950, 1, 1) + timedelta(days=d) for d in range(0, 20000, 7)]
+        n = len(dobs)
+        df = pd.DataFrame({
+            'loan_amount': [1000000.0] * n,
+            'loan_tenure_months': [36] * n,
+            'interest_rate': [9.5] * n,
+            'monthly_income': [75000.0] * n,
+            'years_of_experience': [5.0] * n,
+            'date_of_birth': dobs,
+            'risk_probability': [0.2] * n,
+            'loan_purpose': ['Personal'] * n,
+            'employment_type': ['Salaried'] * n,
+        })
+        training_ages = engineer_features(df, today=today)['age'].tolist()
+        assert training_ages == [calculate_age(dob, today) for dob in dobs]
+
+
 class TestRiskLevel:
     """Tests for risk level categorization."""
 
@@ -212,6 +247,42 @@ class TestRiskLevel:
         assert get_risk_level(0.90) == 'High'
 
 
+class TestApprovalStatus:
+    """Tests for the approval decision thresholds."""
+
+    def test_approved(self):
+        assert get_approval_status(0.10) == 'Approved'
+        assert get_approval_status(0.45) == 'Approved'
+
+    def test_pending(self):
+        assert get_approval_status(0.46) == 'Pending'
+        assert get_approval_status(0.60) == 'Pending'
+
+    def test_rejected(self):
+        assert get_approval_status(0.61) == 'Rejected'
+        assert get_approval_status(0.95) == 'Rejected'
+
+
+class TestVectorized:
+    """Array variants should match the scalar functions element-wise."""
+
+    def test_emi_vec(self):
+        cases = [(3000000, 9.5, 240), (120000, 0, 12), (1000000, 15.0, 60)]
+        principal, rate, tenure = zip(*cases)
+        emis = calculate_emi_vec(principal, rate, tenure)
+        assert list(emis) == [calculate_emi(*c) for c in cases]
+
+    def test_classify_npa_vec(self):
+        days = [0, 89, 90, 180, 181, 365, 366, 1000]
+        assert list(classify_npa_vec(days)) == [classify_npa(d) for d in days]
+
+    def test_provision_vec(self):
+        amounts = [100000, 200000, 300000, 400000, 500000]
+        categories = ['Standard', 'Sub-Standard', 'Doubtful', 'Loss', 'Unknown']
+        provisions = calculate_provision_vec(amounts, categories)
+        assert list(provisions) == [calculate_provision(a, c) for a, c in zip(amounts, categories)]
+
+
 class TestRecommendation:
     """Tests for recommendation text generation."""
 
@@ -4,86 +4,101 @@ Unit tests for Customer API routes.
 Tests customer listing, detail retrieval, and registration endpoints.
 """
 
-import sys
-import os
-import json
+import uuid
 import pytest
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from tests._helpers import assert_json
 
-from backend.app import create_app
 
+# Request bodies (serialized by the test client through the app's orjson provider)
+_MISSING_FIELDS = {'first_name': 'Test'}
 
-@pytest.fixture
-def client():
-    """Create a test client for the Flask application."""
-    app = create_app()
-    app.config['TESTING'] = True
-    with app.test_client() as client:
-        yield client
+_VALID_CUSTOMER = {
+    'first_name': 'Test',
+    'last_name': 'User',
+    'date_of_birth': '1990-05-15',
+    'email': f'test.user.{uuid.uuid4().hex[:8]}@test.com',
+    'phone': '+91-9876543210',
+    'gender': 'Male',
+    'city': 'Mumbai',
+    'state': 'Maharashtra'
+}
+
+
+class TestSmokeEndpoints:
+    """Health, root and unknown-route smoke checks (no database needed)."""
+
+    @pytest.mark.parametrize('path, expected_status, required_keys, expected_values', [
+        ('/health', 200, ('status',), {'status': 'healthy'}),
+        ('/', 200, ('name', 'endpoints'), {}),
+        ('/api/nonexistent', 404, (), {}),
+    ], ids=['health', 'root', 'not_found'])
+    def test_smoke(self, client, path, expected_status, required_keys, expected_values):
+        """Endpoint should return the expected status and body keys."""
+        data = assert_json(client.get(path), [expected_status], required_keys)
+        for key, value in expected_values.items():
+            assert data[key] == value
 
 
 class TestHealthEndpoint:
-    """Tests for the health check endpoint."""
+    """Tests for the readiness probe."""
 
-    def test_health_check(self, client):
-        """Health endpoint should return 200."""
-        response = client.get('/health')
-        assert response.status_code == 200
-        data = json.loads(response.data)
-        assert 'status' in data
-        assert data['status'] == 'healthy'
+    def test_readiness_check(self, client):
+        """Readiness endpoint should report database availability."""
+        response = client.get('/readiness')
+        assert response.status_code in [200, 503]
+        data = response.get_json()
+        assert 'database' in data
 
 
+@pytest.mark.usefixtures('requires_db')
 class TestCustomerListEndpoint:
     """Tests for GET /api/customers/"""
 
-    def test_get_customers_default(self, client):
-        """Should return customers with default pagination."""
-        response = client.get('/api/customers/')
-        assert response.status_code in [200, 500]  # 500 if DB not connected
-        if response.status_code == 200:
-            data = json.loads(response.data)
-            assert 'customers' in data
-            assert 'total' in data
-            assert 'limit' in data
-            assert 'offset' in data
-
-    def test_get_customers_with_pagination(self, client):
-        """Should respect limit and offset parameters."""
-        response = client.get('/api/customers/?limit=10&offset=5')
-        assert response.status_code in [200, 500]
-        if response.status_code == 200:
-            data = json.loads(response.data)
-            assert data['limit'] == 10
-            assert data['offset'] == 5
-            assert len(data['customers']) <= 10
-
-    def test_get_customers_max_limit(self, client):
-        """Limit should be capped at 500."""
-        response = client.get('/api/customers/?limit=9999')
-        assert response.status_code in [200, 500]
-        if response.status_code == 200:
-            data = json.loads(response.data)
-            assert data['limit'] <= 500
-
-
+    @pytest.mark.parametrize('query_string, expected_limit, expected_offset', [
+        ('', None, None),                       # default pagination
+        ('?limit=10&offset=5', 10, 5),          # explicit limit and offset
+        ('?limit=9999', 500, None),             # limit capped at 500
+    ], ids=['default', 'pagination', 'max_limit'])
+    def test_get_customers(self, client, query_string, expected_limit, expected_offset):
+        """Should return a page of customers honouring limit/offset."""
+        data = assert_json(client.get('/api/customers/' + query_string), [200],
+                           ('customers', 'total', 'limit', 'offset'))
+        if expected_limit is not None:
+            assert data['limit'] == expected_limit
+            assert len(data['customers']) <= expected_limit
+        if expected_offset is not None:
+            assert data['offset'] == expected_offset
+
+    def test_get_customers_keyset_pagination(self, client):
+        """Should only return customers after the given cursor."""
+        data = assert_json(client.get('/api/customers/?limit=5&after_id=10'), [200],
+                           ('next_cursor',))
+        for customer in data['customers']:
+            assert customer['customer_id'] > 10
+
+    def test_list_created_at_matches_detail(self, client):
+        """List rows should format created_at exactly like the detail endpoint."""
+        data = assert_json(client.get('/api/customers/?limit=5'), [200])
+        for customer in data['customers']:
+            detail = assert_json(client.get(f"/api/customers/{customer['customer_id']}"), [200])
+            assert customer['created_at'] == detail['created_at']
+
+
+@pytest.mark.usefixtures('requires_db')
 class TestCustomerDetailEndpoint:
     """Tests for GET /api/customers/<id>"""
 
     def test_get_existing_customer(self, client):
         """Should return customer details if customer exists."""
-        response = client.get('/api/customers/1')
-        assert response.status_code in [200, 404, 500]
-        if response.status_code == 200:
-            data = json.loads(response.data)
-            assert 'customer_id' in data
-            assert 'full_name' in data
+        data = assert_json(client.get('/api/customers/1'), [200],
+                           ('customer_id', 'full_name'))
+        assert data['customer_id'] == 1
 
     def test_get_nonexistent_customer(self, client):
         """Should return 404 for non-existent customer."""
         response = client.get('/api/customers/999999')
-        assert response.status_code in [404, 500]
+        assert response.status_code == 404
 
 
 class TestCustomerRegistration:
@@ -91,10 +106,7 @@ class TestCustomerRegistration:
 
     def test_register_missing_fields(self, client):
         """Should return 400 for missing required fields."""
-        response = client.post('/api/customers/',
-            data=json.dumps({'first_name': 'Test'}),
-            content_type='application/json'
-        )
+        response = client.post('/api/customers/', json=_MISSING_FIELDS)
         assert response.status_code in [400, 500]
 
     def test_register_empty_body(self, client):
@@ -105,41 +117,20 @@ class TestCustomerRegistration:
         )
         assert response.status_code in [400, 500]
 
+    @pytest.mark.usefixtures('requires_db')
     def test_register_valid_customer(self, client):
         """Should register customer with valid data."""
-        import random
-        customer_data = {
-            'first_name': 'Test',
-            'last_name': 'User',
-            'date_of_birth': '1990-05-15',
-            'email': f'test.user.{random.randint(10000, 99999)}@test.com',
-            'phone': '+91-9876543210',
-            'gender': 'Male',
-            'city': 'Mumbai',
-            'state': 'Maharashtra'
-        }
-        response = client.post('/api/customers/',
-            data=json.dumps(customer_data),
-            content_type='application/json'
-        )
-        assert response.status_code in [201, 409, 500]  # 409 if email exists
-
-
-class TestRootEndpoint:
-    """Tests for the root API endpoint."""
-
-    def test_root(self, client):
-        """Root endpoint should return API info."""
-        response = client.get('/')
-        assert response.status_code == 200
-        data = json.loads(response.data)
-        assert 'name' in data
-        assert 'endpoints' in data
-
-    def test_404_endpoint(self, client):
-        """Non-existent endpoint should return 404."""
-        response = client.get('/api/nonexistent')
-        assert response.status_code == 404
+        response = client.post('/api/customers/', json=_VALID_CUSTOMER)
+        assert response.status_code in [201, 409]  # 409 if email exists
+
+    @pytest.mark.usefixtures('requires_db')
+    def test_register_invalidates_list_cache(self, client):
+        """A new customer should be counted by an already-cached list page."""
+        before = assert_json(client.get('/api/customers/?include_total=1'), [200], ('total',))
+        customer = dict(_VALID_CUSTOMER, email=f'test.user.{uuid.uuid4().hex[:8]}@test.com')
+        assert_json(client.post('/api/customers/', json=customer), [201])
+        after = assert_json(client.get('/api/customers/?include_total=1'), [200], ('total',))
+        assert after['total'] == before['total'] + 1
 
 
 if __name__ == '__main__':
@@ -5,23 +5,39 @@ Tests loan application submission, ML prediction integration,
 and loan listing endpoints.
 """
 
-import sys
-import os
-import json
+import orjson
 import pytest
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from backend.routes.loan_routes import _stream_page
+from tests._helpers import assert_json
 
-from backend.app import create_app
 
+# Request bodies (serialized by the test client through the app's orjson provider)
+_MISSING_FIELDS = {'customer_id': 1}
 
-@pytest.fixture
-def client():
-    """Create a test client for the Flask application."""
-    app = create_app()
-    app.config['TESTING'] = True
-    with app.test_client() as client:
-        yield client
+_VALID_APPLICATION = {
+    'customer_id': 1,
+    'loan_amount': 2000000,
+    'loan_tenure_months': 36,
+    'interest_rate': 9.5,
+    'loan_purpose': 'Home Renovation'
+}
+
+_NONEXISTENT_CUSTOMER = {
+    'customer_id': 999999,
+    'loan_amount': 1000000,
+    'loan_tenure_months': 24,
+    'interest_rate': 10.0,
+    'loan_purpose': 'Personal'
+}
+
+_HIGH_RISK_APPLICATION = {
+    'customer_id': 1,
+    'loan_amount': 50000000,  # Very high loan amount
+    'loan_tenure_months': 12,
+    'interest_rate': 14.5,
+    'loan_purpose': 'Personal'
+}
 
 
 class TestLoanApplicationEndpoint:
@@ -29,13 +45,10 @@ class TestLoanApplicationEndpoint:
 
     def test_apply_missing_fields(self, client):
         """Should return 400 for missing required fields."""
-        response = client.post('/api/loans/apply',
-            data=json.dumps({'customer_id': 1}),
-            content_type='application/json'
-        )
+        response = client.post('/api/loans/apply', json=_MISSING_FIELDS)
         assert response.status_code in [400, 500]
         if response.status_code == 400:
-            data = json.loads(response.data)
+            data = response.get_json()
             assert 'error' in data
 
     def test_apply_empty_body(self, client):
@@ -46,118 +59,111 @@ class TestLoanApplicationEndpoint:
         )
         assert response.status_code in [400, 500]
 
+    @pytest.mark.ml
+    @pytest.mark.usefixtures('requires_db', 'warm_model')
     def test_apply_valid_application(self, client):
         """Should process loan application with ML prediction."""
-        application = {
-            'customer_id': 1,
-            'loan_amount': 2000000,
-            'loan_tenure_months': 36,
-            'interest_rate': 9.5,
-            'loan_purpose': 'Home Renovation'
-        }
-        response = client.post('/api/loans/apply',
-            data=json.dumps(application),
-            content_type='application/json'
-        )
-        assert response.status_code in [201, 404, 500]
-        if response.status_code == 201:
-            data = json.loads(response.data)
-            assert 'application_id' in data
-            assert 'credit_score' in data
-            assert 'risk_probability' in data
-            assert 'status' in data
-            assert data['status'] in ['Approved', 'Rejected', 'Pending']
-            assert 'contributors' in data
-            assert 300 <= data['credit_score'] <= 850
-            assert 0 <= data['risk_probability'] <= 1
+        data = assert_json(client.post('/api/loans/apply', json=_VALID_APPLICATION), [201],
+                           ('application_id', 'credit_score', 'risk_probability', 'status', 'contributors'))
+        assert data['status'] in ['Approved', 'Rejected', 'Pending']
+        assert 300 <= data['credit_score'] <= 850
+        assert 0 <= data['risk_probability'] <= 1
 
+    @pytest.mark.usefixtures('requires_db')
     def test_apply_nonexistent_customer(self, client):
         """Should return 404 for non-existent customer."""
-        application = {
-            'customer_id': 999999,
-            'loan_amount': 1000000,
-            'loan_tenure_months': 24,
-            'interest_rate': 10.0,
-            'loan_purpose': 'Personal'
-        }
-        response = client.post('/api/loans/apply',
-            data=json.dumps(application),
-            content_type='application/json'
-        )
-        assert response.status_code in [404, 500]
+        response = client.post('/api/loans/apply', json=_NONEXISTENT_CUSTOMER)
+        assert response.status_code == 404
 
+    @pytest.mark.ml
+    @pytest.mark.usefixtures('requires_db', 'warm_model')
     def test_apply_high_risk_application(self, client):
         """High-risk loan should be flagged appropriately."""
-        application = {
-            'customer_id': 1,
-            'loan_amount': 50000000,  # Very high loan amount
-            'loan_tenure_months': 12,
-            'interest_rate': 14.5,
-            'loan_purpose': 'Personal'
-        }
-        response = client.post('/api/loans/apply',
-            data=json.dumps(application),
-            content_type='application/json'
-        )
-        assert response.status_code in [201, 404, 500]
-        if response.status_code == 201:
-            data = json.loads(response.data)
-            # Very high loan should result in high risk
-            assert data['risk_probability'] > 0.3
+        data = assert_json(client.post('/api/loans/apply', json=_HIGH_RISK_APPLICATION), [201])
+        # Very high loan should result in high risk
+        assert data['risk_probability'] > 0.3
 
 
+@pytest.mark.usefixtures('requires_db')
 class TestLoanApplicationsListEndpoint:
     """Tests for GET /api/loans/applications"""
 
-    def test_get_applications_default(self, client):
-        """Should return applications with default pagination."""
-        response = client.get('/api/loans/applications')
-        assert response.status_code in [200, 500]
-        if response.status_code == 200:
-            data = json.loads(response.data)
-            assert 'applications' in data
-            assert 'total' in data
-
-    def test_get_applications_filter_by_status(self, client):
-        """Should filter applications by status."""
-        response = client.get('/api/loans/applications?status=Approved')
-        assert response.status_code in [200, 500]
-        if response.status_code == 200:
-            data = json.loads(response.data)
+    @pytest.mark.parametrize('query_string, field, value', [
+        ('', None, None),                       # default pagination
+        ('?status=Approved', 'status', 'Approved'),
+        ('?customer_id=1', 'customer_id', 1),
+    ], ids=['default', 'status', 'customer'])
+    def test_get_applications(self, client, query_string, field, value):
+        """Should return applications, filtered by status or customer ID."""
+        data = assert_json(client.get('/api/loans/applications' + query_string), [200],
+                           ('applications', 'total'))
+        if field is not None:
             for app in data['applications']:
-                assert app['status'] == 'Approved'
-
-    def test_get_applications_filter_by_customer(self, client):
-        """Should filter applications by customer ID."""
-        response = client.get('/api/loans/applications?customer_id=1')
-        assert response.status_code in [200, 500]
-        if response.status_code == 200:
-            data = json.loads(response.data)
-            for app in data['applications']:
-                assert app['customer_id'] == 1
+                assert app[field] == value
+
+    def test_get_applications_full_and_summary(self, client):
+        """Rows are complete by default; ?detail=summary omits detail columns."""
+        data = assert_json(client.get('/api/loans/applications?limit=5'), [200])
+        for app in data['applications']:
+            assert 'recommendation' in app
 
+        data = assert_json(client.get('/api/loans/applications?limit=5&detail=summary'), [200])
+        for app in data['applications']:
+            assert 'recommendation' not in app
 
+
+@pytest.mark.usefixtures('requires_db')
 class TestLoansListEndpoint:
     """Tests for GET /api/loans/loans"""
 
-    def test_get_loans_default(self, client):
-        """Should return disbursed loans."""
-        response = client.get('/api/loans/loans')
-        assert response.status_code in [200, 500]
-        if response.status_code == 200:
-            data = json.loads(response.data)
-            assert 'loans' in data
-            assert 'total' in data
-
-    def test_get_loans_filter_by_status(self, client):
-        """Should filter loans by status."""
-        response = client.get('/api/loans/loans?status=Active')
-        assert response.status_code in [200, 500]
-        if response.status_code == 200:
-            data = json.loads(response.data)
+    @pytest.mark.parametrize('query_string, expected_status', [
+        ('', None),                             # all disbursed loans
+        ('?status=Active', 'Active'),
+    ], ids=['default', 'status'])
+    def test_get_loans(self, client, query_string, expected_status):
+        """Should return disbursed loans, optionally filtered by status."""
+        data = assert_json(client.get('/api/loans/loans' + query_string), [200],
+                           ('loans', 'total'))
+        if expected_status is not None:
             for loan in data['loans']:
-                assert loan['loan_status'] == 'Active'
+                assert loan['loan_status'] == expected_status
+
+
+
+class _FailingRows:
+    """Cursor stand-in whose second batch raises, as a dropped connection would."""
+
+    def __init__(self, first):
+        self._first = first
+
+    def fetchone(self):
+        return self._first
+
+    def __iter__(self):
+        raise RuntimeError('connection lost')
+
+
+class TestStreamPage:
+    """Error handling in the streamed list helper (no database needed)."""
+
+    def test_query_error_before_streaming_propagates(self, app):
+        """A failing first fetch should raise inside the route, not mid-stream."""
+        class _BrokenRows:
+            def fetchone(self):
+                raise RuntimeError('relation does not exist')
+
+        with app.test_request_context():
+            with pytest.raises(RuntimeError):
+                _stream_page('loans', _BrokenRows(), 1, None, 10, 0, dict)
 
+    def test_midstream_error_ends_with_error_key(self, app):
+        """A failure after the first row should leave valid JSON with an error key."""
+        with app.test_request_context():
+            response = _stream_page('loans', _FailingRows(({'loan_id': 1},)), 5, None, 10, 0, dict)
+            data = orjson.loads(b''.join(response.response))
+        assert data['loans'] == [{'loan_id': 1}]
+        assert data['error'] == 'connection lost'
+        assert 'total' not in data
 
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])